@@ -0,0 +1,208 @@
+"""baseline schema
+
+Таблиці travel_plans, locations, change_log, індекси, тригери updated_at/version
+та change_log, materialized view public_plan_catalog - стан, який раніше
+створював python -m app.db_init.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TRIGGERS_SQL = """
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    -- Опціонально: інкремент версії при кожному оновленні
+    NEW.version = OLD.version + 1;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_travel_plans_modtime
+BEFORE UPDATE ON travel_plans
+FOR EACH ROW
+EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE FUNCTION update_location_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER update_locations_modtime
+BEFORE UPDATE ON locations
+FOR EACH ROW
+EXECUTE FUNCTION update_location_updated_at_column();
+
+CREATE OR REPLACE FUNCTION record_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    rec RECORD;
+    plan_id UUID;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'travel_plans' THEN
+        plan_id := rec.id;
+    ELSE
+        plan_id := rec.travel_plan_id;
+    END IF;
+
+    INSERT INTO change_log (entity_type, entity_id, travel_plan_id, operation)
+    VALUES (
+        TG_ARGV[0], rec.id, plan_id,
+        CASE WHEN TG_OP = 'DELETE' THEN 'delete' ELSE 'upsert' END
+    );
+    PERFORM pg_notify('travel_changes', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+CREATE TRIGGER record_travel_plans_change
+AFTER INSERT OR UPDATE OR DELETE ON travel_plans
+FOR EACH ROW
+EXECUTE FUNCTION record_change('travel_plan');
+
+CREATE TRIGGER record_locations_change
+AFTER INSERT OR UPDATE OR DELETE ON locations
+FOR EACH ROW
+EXECUTE FUNCTION record_change('location');
+"""
+
+CATALOG_SQL = """
+CREATE MATERIALIZED VIEW public_plan_catalog AS
+SELECT
+    p.id,
+    p.title,
+    p.description,
+    p.start_date,
+    p.end_date,
+    p.budget,
+    p.currency,
+    p.created_at,
+    p.updated_at,
+    COUNT(l.id) AS location_count,
+    COALESCE(SUM(l.budget), 0) AS locations_budget,
+    MIN(l.arrival_date) AS first_arrival,
+    MAX(l.departure_date) AS last_departure
+FROM travel_plans p
+LEFT JOIN locations l ON l.travel_plan_id = p.id
+WHERE p.is_public
+GROUP BY p.id;
+
+CREATE UNIQUE INDEX idx_public_plan_catalog_id ON public_plan_catalog(id);
+CREATE INDEX idx_public_plan_catalog_recent ON public_plan_catalog(updated_at DESC, id);
+CREATE INDEX idx_public_plan_catalog_popular ON public_plan_catalog(location_count DESC, updated_at DESC, id);
+"""
+
+
+def _create_locations():
+    from app.config import settings
+
+    if settings.LOCATIONS_PARTITIONS > 0:
+        from app.partitioning import create_partitioned_locations
+        create_partitioned_locations(op.get_bind(), settings.LOCATIONS_PARTITIONS)
+        return
+
+    op.create_table(
+        'locations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('travel_plan_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('latitude', sa.Numeric(precision=10, scale=6), nullable=True),
+        sa.Column('longitude', sa.Numeric(precision=11, scale=6), nullable=True),
+        sa.Column('visit_order', sa.Integer(), nullable=False),
+        sa.Column('arrival_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('departure_date', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('budget', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint('length(name) > 0', name='location_name_length_check'),
+        sa.CheckConstraint('latitude >= -90 AND latitude <= 90', name='location_latitude_check'),
+        sa.CheckConstraint('longitude >= -180 AND longitude <= 180', name='location_longitude_check'),
+        sa.CheckConstraint('visit_order > 0', name='location_visit_order_check'),
+        sa.CheckConstraint('budget >= 0', name='location_budget_check'),
+        sa.CheckConstraint('departure_date >= arrival_date', name='check_location_dates'),
+        sa.ForeignKeyConstraint(['travel_plan_id'], ['travel_plans.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_locations_travel_plan_id', 'locations', ['travel_plan_id'])
+    op.create_index('idx_locations_updated_at', 'locations', ['updated_at'])
+
+
+def upgrade() -> None:
+    op.create_table(
+        'travel_plans',
+        sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=True),
+        sa.Column('end_date', sa.Date(), nullable=True),
+        sa.Column('budget', sa.Numeric(precision=10, scale=2), nullable=True),
+        sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False),
+        sa.Column('is_public', sa.Boolean(), server_default='false', nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint('length(title) > 0', name='travel_plan_title_length_check'),
+        sa.CheckConstraint('length(currency) = 3', name='travel_plan_currency_length_check'),
+        sa.CheckConstraint('budget >= 0', name='travel_plan_budget_check'),
+        sa.CheckConstraint('version > 0', name='travel_plan_version_check'),
+        sa.CheckConstraint('end_date >= start_date', name='check_plan_dates'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_travel_plans_updated_at', 'travel_plans', ['updated_at'])
+
+    _create_locations()
+
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('txid', sa.BigInteger(), server_default=sa.text('(pg_current_xact_id()::text)::bigint'), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('travel_plan_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.CheckConstraint("entity_type IN ('travel_plan', 'location')", name='change_log_entity_type_check'),
+        sa.CheckConstraint("operation IN ('upsert', 'delete')", name='change_log_operation_check'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('idx_change_log_txid_id', 'change_log', ['txid', 'id'])
+
+    op.execute(TRIGGERS_SQL)
+    op.execute(CATALOG_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS public_plan_catalog")
+    op.drop_table('change_log')
+    op.drop_table('locations')
+    op.drop_table('travel_plans')
+    op.execute("DROP FUNCTION IF EXISTS record_change()")
+    op.execute("DROP FUNCTION IF EXISTS update_location_updated_at_column()")
+    op.execute("DROP FUNCTION IF EXISTS update_updated_at_column()")
@@ -0,0 +1,36 @@
+"""change_log retention horizon
+
+Таблиця change_log_horizon: позиція (txid, id) останнього запису, видаленого
+з change_log при очищенні за CHANGES_RETENTION.
+
+Revision ID: 0002_change_log_horizon
+Revises: 0001_baseline
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_change_log_horizon'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log_horizon',
+        sa.Column('id', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+        sa.Column('txid', sa.BigInteger(), nullable=False),
+        sa.Column('change_id', sa.BigInteger(), nullable=False),
+        sa.CheckConstraint('id', name='change_log_horizon_single_row_check'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_log_horizon')
@@ -0,0 +1,32 @@
+"""pagination indexes
+
+Індекси під порядок сторінок списків у шардованому режимі: кожен шард
+виконує ORDER BY created_at, id (плани) та ORDER BY visit_order, id (локації)
+з LIMIT skip + limit. Для партиціонованої locations індекс створюється
+на кожній партиції.
+
+Revision ID: 0003_pagination_indexes
+Revises: 0002_change_log_horizon
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_pagination_indexes'
+down_revision: Union[str, None] = '0002_change_log_horizon'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX IF NOT EXISTS idx_travel_plans_created_at_id ON travel_plans(created_at, id)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_locations_visit_order_id ON locations(visit_order, id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_locations_visit_order_id")
+    op.execute("DROP INDEX IF EXISTS idx_travel_plans_created_at_id")
@@ -0,0 +1,214 @@
+"""
+Adaptive admission control: обмеження конкурентності окремо для читань та записів,
+коротка обмежена черга та швидке відхилення (503 + Retry-After) при перевантаженні.
+
+Ліміт підлаштовується за AIMD: кожен запит, що вклався в цільову затримку,
+додає 1/limit (≈ +1 за "вікно"), повільний запит зменшує ліміт у BACKOFF разів
+(не частіше ніж раз на цільову затримку, щоб серія повільних відповідей
+не обвалила ліміт до мінімуму).
+
+Сума максимальних лімітів читань і записів не перевищує ємність пулу з'єднань
+(DB_POOL_SIZE + DB_MAX_OVERFLOW - DB_POOL_RESERVED): кожен прийнятий запит,
+зокрема об'єднане читання чи fan-out по шардах (по з'єднанню на шард, у пулі
+кожного шарду), тримає щонайбільше одне з'єднання пулу, тож прийняті запити
+не чекають на pool_timeout. SSE-потоки змін не проходять admission control:
+їхні читання обмежені CHANGES_STREAM_READERS і входять у DB_POOL_RESERVED.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Optional
+
+from app.config import settings
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdaptiveLimiter:
+    BACKOFF = 0.9
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        max_queue: int,
+        queue_timeout: float,
+        target_latency: float
+    ):
+        self.name = name
+        self.limit = float(min(initial_limit, max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.shed_count = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """
+        Займає слот; повертає False, якщо запит потрібно відхилити
+        """
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        if self.queue_depth >= self.max_queue:
+            self.shed_count += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.shed_count += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передано цьому запиту - повертаємо його
+                self.release(None)
+            else:
+                self._discard(waiter)
+            raise
+
+    def release(self, latency: Optional[float]):
+        self.in_flight -= 1
+        if latency is not None:
+            self._adapt(latency)
+        self._wake()
+
+    def _adapt(self, latency: float):
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.BACKOFF)
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "shed": self.shed_count,
+        }
+
+
+def pool_capacity() -> int:
+    """
+    З'єднання пулу, доступні запитам
+    """
+    return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW - settings.DB_POOL_RESERVED
+
+
+def max_limits() -> tuple[int, int]:
+    """
+    Максимальні ліміти (читання, записи): ємність пулу ділиться пропорційно початковим лімітам
+    """
+    capacity = pool_capacity()
+    configured = settings.ADMISSION_READ_LIMIT + settings.ADMISSION_WRITE_LIMIT
+    read_max = max(settings.ADMISSION_MIN_LIMIT, capacity * settings.ADMISSION_READ_LIMIT // configured)
+    write_max = max(settings.ADMISSION_MIN_LIMIT, capacity - read_max)
+    return min(read_max, settings.ADMISSION_MAX_LIMIT), min(write_max, settings.ADMISSION_MAX_LIMIT)
+
+
+READ_MAX_LIMIT, WRITE_MAX_LIMIT = max_limits()
+
+read_limiter = AdaptiveLimiter(
+    "reads",
+    initial_limit=settings.ADMISSION_READ_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=READ_MAX_LIMIT,
+    max_queue=settings.ADMISSION_READ_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    target_latency=settings.ADMISSION_READ_TARGET_LATENCY,
+)
+
+write_limiter = AdaptiveLimiter(
+    "writes",
+    initial_limit=settings.ADMISSION_WRITE_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=WRITE_MAX_LIMIT,
+    max_queue=settings.ADMISSION_WRITE_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+    target_latency=settings.ADMISSION_WRITE_TARGET_LATENCY,
+)
+
+
+def admission_stats() -> dict:
+    return {
+        limiter.name: limiter.stats()
+        for limiter in (read_limiter, write_limiter)
+    }
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware (без буферизації тіла, тому не ламає SSE-потоки)
+    """
+
+    def __init__(self, app, exempt_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.exempt_paths = exempt_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = read_limiter if scope["method"] in READ_METHODS else write_limiter
+        if not await limiter.acquire():
+            await self._reject(send)
+            return
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            await self.app(scope, receive, send)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # Помилки не використовуємо для підлаштування ліміту
+            limiter.release(None if failed else time.perf_counter() - started)
+
+    async def _reject(self, send):
+        body = json.dumps({"error": "Service overloaded, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.ADMISSION_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
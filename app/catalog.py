@@ -0,0 +1,123 @@
+"""
+Каталог публічних планів: materialized view public_plan_catalog,
+періодичне REFRESH ... CONCURRENTLY та in-memory snapshot перших сторінок.
+
+Оновлення view виконує лише один воркер (pg_try_advisory_lock) і лише якщо
+change_log просунувся з моменту попереднього оновлення. Snapshot у пам'яті
+кожен воркер перечитує на кожному циклі - це кілька сотень рядків.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import data_engines
+from app.schemas.catalog import CatalogEntry
+from app.sharding import merge_pages
+
+logger = logging.getLogger(__name__)
+
+# Довільний, але фіксований ключ advisory lock для оновлення каталогу
+REFRESH_LOCK_KEY = 720_032
+
+SORT_ORDERS = {
+    "recent": "updated_at DESC, id",
+    # Популярність - за кількістю локацій (окремої метрики переглядів немає)
+    "popular": "location_count DESC, updated_at DESC, id",
+}
+
+# Ключі злиття сторінок шардів, відповідають SORT_ORDERS
+SORT_KEYS = {
+    "recent": lambda e: (-e.updated_at.timestamp(), e.id.int),
+    "popular": lambda e: (-e.location_count, -e.updated_at.timestamp(), e.id.int),
+}
+
+CATALOG_COLUMNS = (
+    "id, title, description, start_date, end_date, budget, currency, location_count, "
+    "locations_budget, first_arrival, last_departure, created_at, updated_at"
+)
+
+
+def query_catalog(conn, sort: str, skip: int, limit: int) -> list[CatalogEntry]:
+    rows = conn.execute(text(
+        f"SELECT {CATALOG_COLUMNS} FROM public_plan_catalog "
+        f"ORDER BY {SORT_ORDERS[sort]} OFFSET :skip LIMIT :limit"
+    ), {"skip": skip, "limit": limit}).mappings().all()
+    return [CatalogEntry.model_validate(dict(row)) for row in rows]
+
+
+class CatalogSnapshot:
+
+    def __init__(self):
+        self._pages: dict[str, list[CatalogEntry]] = {}
+        # Остання врахована зміна change_log для кожної БД (шарду)
+        self._last_change_ids: dict[int, Optional[int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def get(self, sort: str, skip: int, limit: int) -> Optional[list[CatalogEntry]]:
+        """
+        Повертає сторінку зі snapshot або None, якщо її там немає
+        """
+        entries = self._pages.get(sort)
+        if entries is None:
+            return None
+        if skip + limit > settings.CATALOG_SNAPSHOT_SIZE:
+            return None
+        return entries[skip:skip + limit]
+
+    def _refresh_view(self, conn, index: int):
+        if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": REFRESH_LOCK_KEY}).scalar():
+            return
+        try:
+            change_id = conn.execute(text("SELECT max(id) FROM change_log")).scalar()
+            if index not in self._last_change_ids or change_id != self._last_change_ids[index]:
+                conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY public_plan_catalog"))
+                conn.commit()
+                self._last_change_ids[index] = change_id
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": REFRESH_LOCK_KEY})
+            conn.commit()
+
+    def refresh(self):
+        """
+        Оновлює view (за потреби) та перечитує snapshot. Виконується в threadpool.
+        У шардованому режимі - на кожному шарді, snapshot зливається з усіх
+        """
+        pages = {sort: [] for sort in SORT_ORDERS}
+        for index, data_engine in enumerate(data_engines()):
+            with data_engine.connect() as conn:
+                self._refresh_view(conn, index)
+                for sort in SORT_ORDERS:
+                    pages[sort].append(query_catalog(conn, sort, 0, settings.CATALOG_SNAPSHOT_SIZE))
+
+        self._pages = {
+            sort: merge_pages(pages[sort], SORT_KEYS[sort], 0, settings.CATALOG_SNAPSHOT_SIZE)
+            for sort in SORT_ORDERS
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.refresh)
+            except Exception as e:
+                logger.warning("Catalog refresh failed: %s", e)
+            await asyncio.sleep(settings.CATALOG_REFRESH_INTERVAL)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,377 @@
+"""
+Change feed: читання журналу змін change_log та сповіщення через LISTEN/NOTIFY.
+
+Курсор - пара (txid, id). Читаються лише записи транзакцій з txid нижче
+xmin поточного snapshot, тобто гарантовано завершених, тому транзакція,
+що закомітилась пізніше за іншу з більшим txid, не буде пропущена.
+
+Записи, старші за CHANGES_RETENTION, видаляє фонова задача; позиція
+останнього видаленого запису зберігається в change_log_horizon, і токени
+до неї відхиляються (410), бо частина змін після них уже втрачена.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import literal_column, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import engine, data_engines
+from app.models import TravelPlan, Location, ChangeLog, ChangeLogHorizon
+from app.schemas.change import ChangeEntry, ChangeFeedResponse
+from app.schemas.location import LocationResponse
+from app.schemas.travel_plan import TravelPlanResponse
+
+logger = logging.getLogger(__name__)
+
+CHANGES_CHANNEL = "travel_changes"
+
+# Найменший txid, що може належати незавершеній транзакції
+_SNAPSHOT_HORIZON = literal_column("(pg_snapshot_xmin(pg_current_snapshot())::text)::bigint")
+
+
+# Токен, що вказує на поточний кінець журналу (для старту після повного завантаження)
+HEAD_TOKEN = "now"
+
+
+# Довільний, але фіксований ключ advisory lock для очищення журналу
+PRUNE_LOCK_KEY = 720_026
+
+
+class InvalidChangeToken(ValueError):
+    pass
+
+
+class ExpiredChangeToken(ValueError):
+    """
+    Токен старший за межу очищення журналу - потрібна повна ресинхронізація
+    """
+
+
+def encode_token(txid: int, change_id: int) -> str:
+    return f"{txid}.{change_id}"
+
+
+def decode_token(token: Optional[str]) -> tuple[int, int]:
+    """
+    Розбирає токен виду "<txid>.<id>"; порожній токен означає початок журналу
+    """
+    if not token or token == HEAD_TOKEN:
+        return 0, 0
+    try:
+        txid, change_id = token.split(".")
+        return int(txid), int(change_id)
+    except ValueError:
+        raise InvalidChangeToken(f"Invalid change token: {token}")
+
+
+def retention_horizon(db: Session) -> tuple[int, int]:
+    horizon = db.execute(select(ChangeLogHorizon.txid, ChangeLogHorizon.change_id)).first()
+    return tuple(horizon) if horizon else (0, 0)
+
+
+def check_token(db: Session, since: Optional[str]):
+    """
+    Перевіряє, що зміни після токена since ще є в журналі
+    """
+    if since == HEAD_TOKEN:
+        return
+    if decode_token(since) < retention_horizon(db):
+        raise ExpiredChangeToken(
+            f"Change token is older than the retained change log ({settings.CHANGES_RETENTION:g}s), full resync required"
+        )
+
+
+def fetch_changes(db: Session, since: Optional[str], limit: int) -> ChangeFeedResponse:
+    """
+    Повертає сторінку змін після токена since.
+    Кілька змін однієї сутності на сторінці згортаються в останню, тому записи
+    впорядковані за позицією в журналі, і token кожного запису - коректна точка відновлення.
+    """
+    if since == HEAD_TOKEN:
+        last = db.execute(
+            select(ChangeLog.txid, ChangeLog.id)
+            .where(ChangeLog.txid < _SNAPSHOT_HORIZON)
+            .order_by(ChangeLog.txid.desc(), ChangeLog.id.desc())
+            .limit(1)
+        ).first()
+        # Журнал може бути порожнім після очищення - тоді кінець журналу це межа очищення
+        token = encode_token(*(last or retention_horizon(db)))
+        return ChangeFeedResponse(changes=[], next_token=token, has_more=False)
+
+    last_txid, last_id = decode_token(since)
+
+    rows = db.execute(
+        select(ChangeLog)
+        .where(
+            tuple_(ChangeLog.txid, ChangeLog.id) > tuple_(last_txid, last_id),
+            ChangeLog.txid < _SNAPSHOT_HORIZON,
+        )
+        .order_by(ChangeLog.txid, ChangeLog.id)
+        .limit(limit)
+    ).scalars().all()
+    # Після читання: очищення зсуває межу в тій же транзакції, що й DELETE,
+    # тому записи, видалені до нашого запиту, тут гарантовано помітні
+    check_token(db, since)
+
+    if not rows:
+        return ChangeFeedResponse(changes=[], next_token=encode_token(last_txid, last_id), has_more=False)
+
+    # Залишаємо лише останній запис для кожної сутності
+    latest = {}
+    for row in rows:
+        key = (row.entity_type, row.entity_id)
+        latest.pop(key, None)
+        latest[key] = row
+
+    plan_ids = [r.entity_id for r in latest.values() if r.entity_type == "travel_plan" and r.operation == "upsert"]
+    location_ids = [r.entity_id for r in latest.values() if r.entity_type == "location" and r.operation == "upsert"]
+
+    plans = {}
+    if plan_ids:
+        plans = {p.id: p for p in db.query(TravelPlan).filter(TravelPlan.id.in_(plan_ids)).all()}
+    locations = {}
+    if location_ids:
+        locations = {l.id: l for l in db.query(Location).filter(Location.id.in_(location_ids)).all()}
+
+    changes = []
+    for row in latest.values():
+        data = None
+        if row.operation == "upsert":
+            if row.entity_type == "travel_plan":
+                obj = plans.get(row.entity_id)
+                schema = TravelPlanResponse
+            else:
+                obj = locations.get(row.entity_id)
+                schema = LocationResponse
+            if obj is None:
+                # Сутність уже видалена - tombstone буде далі в журналі
+                continue
+            data = schema.model_validate(obj).model_dump(mode="json")
+
+        changes.append(ChangeEntry(
+            entity_type=row.entity_type,
+            operation=row.operation,
+            entity_id=row.entity_id,
+            travel_plan_id=row.travel_plan_id,
+            changed_at=row.changed_at,
+            data=data,
+            # Для згорнутих змін - позиція останнього запису сутності
+            token=encode_token(row.txid, row.id),
+        ))
+
+    last = rows[-1]
+    return ChangeFeedResponse(
+        changes=changes,
+        next_token=encode_token(last.txid, last.id),
+        has_more=len(rows) == limit,
+    )
+
+
+def prune_changes(conn) -> int:
+    """
+    Видаляє записи change_log, старші за CHANGES_RETENTION, батчами по
+    CHANGES_PRUNE_BATCH і зсуває change_log_horizon. Повертає кількість видалених записів.
+
+    Межа - перший запис (у порядку курсора), новіший за retention: пошук іде
+    по idx_change_log_txid_id і переглядає лише рядки, що підлягають видаленню.
+    """
+    # Транзакції з txid >= xmin ще можуть дописати в журнал, тому межа не далі за (xmin, 0)
+    xmin = conn.execute(select(_SNAPSHOT_HORIZON)).scalar()
+    first_retained = conn.execute(text("""
+        SELECT txid, id FROM change_log
+        WHERE changed_at >= now() - make_interval(secs => :retention)
+        ORDER BY txid, id
+        LIMIT 1
+    """), {"retention": settings.CHANGES_RETENTION}).first()
+    conn.commit()
+    boundary = min(tuple(first_retained), (xmin, 0)) if first_retained else (xmin, 0)
+
+    deleted = 0
+    while True:
+        rows = conn.execute(text("""
+            DELETE FROM change_log WHERE id IN (
+                SELECT id FROM change_log
+                WHERE (txid, id) < (:txid, :id)
+                ORDER BY txid, id
+                LIMIT :batch
+            )
+            RETURNING txid, id
+        """), {"txid": boundary[0], "id": boundary[1], "batch": settings.CHANGES_PRUNE_BATCH}).all()
+        if not rows:
+            break
+        txid, change_id = max(tuple(row) for row in rows)
+        conn.execute(text("""
+            INSERT INTO change_log_horizon (id, txid, change_id) VALUES (true, :txid, :change_id)
+            ON CONFLICT (id) DO UPDATE SET txid = EXCLUDED.txid, change_id = EXCLUDED.change_id
+            WHERE (change_log_horizon.txid, change_log_horizon.change_id) < (EXCLUDED.txid, EXCLUDED.change_id)
+        """), {"txid": txid, "change_id": change_id})
+        # Кожен батч - окрема транзакція, щоб не тримати довгі блокування
+        conn.commit()
+        deleted += len(rows)
+        if len(rows) < settings.CHANGES_PRUNE_BATCH:
+            break
+    return deleted
+
+
+class ChangeLogPruner:
+    """
+    Фонове очищення change_log кожні CHANGES_PRUNE_INTERVAL секунд.
+    На кожній БД (шарді) очищення виконує лише один воркер (pg_try_advisory_lock)
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def prune(self):
+        """
+        Виконується в threadpool
+        """
+        for data_engine in data_engines():
+            with data_engine.connect() as conn:
+                if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": PRUNE_LOCK_KEY}).scalar():
+                    continue
+                try:
+                    deleted = prune_changes(conn)
+                    if deleted:
+                        logger.info("Pruned %d change_log rows older than %gs", deleted, settings.CHANGES_RETENTION)
+                finally:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": PRUNE_LOCK_KEY})
+                    conn.commit()
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.prune)
+            except Exception as e:
+                logger.warning("Change log pruning failed: %s", e)
+            await asyncio.sleep(settings.CHANGES_PRUNE_INTERVAL)
+
+    def start(self):
+        if self._task is None and settings.CHANGES_RETENTION > 0 and settings.CHANGES_PRUNE_INTERVAL > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+change_log_pruner = ChangeLogPruner()
+
+
+class ChangeNotifier:
+    """
+    Одне LISTEN-з'єднання на процес, що будить усіх підписників (SSE-потоки).
+    Якщо event loop не підтримує add_reader (напр. Proactor на Windows),
+    підписники працюють в режимі періодичного опитування.
+
+    З'єднання відкривається в threadpool, щоб недоступна БД не блокувала
+    event loop; після невдалої спроби наступна - не раніше ніж через
+    експоненційно зростаючий інтервал (до CHANGES_LISTEN_RETRY_MAX).
+    """
+
+    def __init__(self):
+        self._subscribers: set[asyncio.Event] = set()
+        self._conn = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._polling_only = False
+        self._connecting = False
+        self._retry_delay = 0.0
+        self._retry_at = 0.0
+
+    def subscribe(self) -> asyncio.Event:
+        event = asyncio.Event()
+        self._subscribers.add(event)
+        return event
+
+    def unsubscribe(self, event: asyncio.Event):
+        self._subscribers.discard(event)
+        if not self._subscribers:
+            self._close()
+
+    def _connect(self):
+        cargs, cparams = engine.dialect.create_connect_args(engine.url)
+        conn = engine.dialect.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANGES_CHANNEL}")
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    async def ensure_listening(self):
+        if self._conn is not None or self._polling_only or self._connecting:
+            return
+        if time.monotonic() < self._retry_at:
+            return
+
+        self._connecting = True
+        conn = None
+        try:
+            conn = await run_in_threadpool(self._connect)
+            loop = asyncio.get_running_loop()
+            loop.add_reader(conn.fileno(), self._on_readable)
+        except NotImplementedError:
+            logger.warning("Event loop does not support add_reader, change stream falls back to polling")
+            self._polling_only = True
+            conn.close()
+            return
+        except Exception as e:
+            self._retry_delay = min(max(self._retry_delay * 2, 1.0), settings.CHANGES_LISTEN_RETRY_MAX)
+            self._retry_at = time.monotonic() + self._retry_delay
+            logger.warning("Could not LISTEN on %s (retry in %.0fs): %s", CHANGES_CHANNEL, self._retry_delay, e)
+            if conn is not None:
+                conn.close()
+            return
+        finally:
+            self._connecting = False
+
+        self._conn = conn
+        self._loop = loop
+        self._retry_delay = 0.0
+        if not self._subscribers:
+            # Усі потоки закрилися, поки відкривалось з'єднання
+            self._close()
+
+    def _on_readable(self):
+        try:
+            self._conn.poll()
+        except Exception as e:
+            logger.warning("LISTEN connection lost: %s", e)
+            self._close()
+            self._wake_all()
+            return
+        if self._conn.notifies:
+            self._conn.notifies.clear()
+            self._wake_all()
+
+    def _wake_all(self):
+        for event in self._subscribers:
+            event.set()
+
+    def _close(self):
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except Exception:
+            pass
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+        self._loop = None
+
+
+notifier = ChangeNotifier()
@@ -0,0 +1,100 @@
+"""
+Single-flight об'єднання однакових конкурентних читань у межах воркера.
+
+Для кожного ключа одночасно виконується не більше одного запиту до БД.
+Читання приєднуються до запиту, лише поки він ще не почав виконуватись.
+Читання, що прийшли поки запит уже виконується, НЕ приєднуються до нього,
+а чекають наступного запиту, який стартує після завершення поточного
+і обслуговує їх усіх разом. Тому snapshot, з якого читач отримує результат,
+завжди взято після початку цього читання, і запис, закомічений до його
+початку (в будь-якому воркері), у результаті вже видно.
+"""
+import asyncio
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+
+
+class _KeyState:
+    __slots__ = ("running", "pending", "started")
+
+    def __init__(self):
+        self.running: Optional[asyncio.Future] = None
+        self.pending: Optional[asyncio.Future] = None
+        # Чи вже відправлено запит для running (після цього до нього не приєднуються)
+        self.started = False
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._keys: dict[Hashable, _KeyState] = {}
+        # Сильні посилання на задачі, щоб їх не зібрав GC
+        self._tasks: set[asyncio.Task] = set()
+
+    async def do(self, key: Hashable, fn: Callable[[], Any], limiter: Optional[asyncio.Semaphore] = None) -> Any:
+        """
+        Виконує fn (синхронну, у threadpool) або чекає спільного результату.
+        limiter обмежує кількість одночасних виконань fn (не очікувачів)
+        """
+        if not settings.READ_COALESCING_ENABLED:
+            return await self._call(fn, limiter)
+
+        loop = asyncio.get_running_loop()
+        state = self._keys.get(key)
+        if state is None:
+            state = _KeyState()
+            self._keys[key] = state
+            state.running = loop.create_future()
+            future = state.running
+            # Окрема задача: скасування запиту клієнтом не зупиняє спільне читання
+            task = asyncio.create_task(self._drive(key, state, fn, limiter))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif not state.started:
+            future = state.running
+        else:
+            if state.pending is None:
+                state.pending = loop.create_future()
+            future = state.pending
+
+        return await asyncio.shield(future)
+
+    @staticmethod
+    async def _call(fn: Callable[[], Any], limiter: Optional[asyncio.Semaphore]) -> Any:
+        if limiter is None:
+            return await run_in_threadpool(fn)
+        async with limiter:
+            return await run_in_threadpool(fn)
+
+    async def _drive(self, key: Hashable, state: _KeyState, fn: Callable[[], Any],
+                     limiter: Optional[asyncio.Semaphore]):
+        while True:
+            future = state.running
+            try:
+                if limiter is not None:
+                    # Поки читання чекає на слот, до нього ще можна приєднатися
+                    await limiter.acquire()
+                state.started = True
+                try:
+                    result = await run_in_threadpool(fn)
+                finally:
+                    if limiter is not None:
+                        limiter.release()
+            except Exception as e:
+                future.set_exception(e)
+                # Щоб не було "Future exception was never retrieved", якщо всі читачі пішли
+                future.exception()
+            else:
+                future.set_result(result)
+
+            if state.pending is None:
+                del self._keys[key]
+                return
+            state.running, state.pending = state.pending, None
+            state.started = False
+
+
+single_flight = SingleFlight()
@@ -1,6 +1,7 @@
 """
 Скрипт для ініціалізації бази даних та створення таблиць
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -8,9 +9,12 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.database import engine, Base
-from app.models import TravelPlan, Location
+from app.config import settings
+from app.database import engine, Base, SHARDING_ENABLED
+from app.models import TravelPlan, Location, ChangeLog, ChangeLogHorizon
+from app.partitioning import create_partitioned_locations, locations_kind, migrate_locations_to_partitioned
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 
 
 def create_trigger_function():
@@ -40,16 +44,171 @@ def create_trigger_function():
     return trigger_function_sql, trigger_sql
 
 
-def init_db():
+def create_change_feed_sql():
     """
-    Створює всі таблиці в базі даних, функції та тригери
+    Повертає SQL для change feed: updated_at для locations, індекси
+    та тригери, що пишуть зміни і tombstones у change_log з NOTIFY
+    """
+    schema_sql = """
+    ALTER TABLE locations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+    CREATE INDEX IF NOT EXISTS idx_locations_updated_at ON locations(updated_at);
+    CREATE INDEX IF NOT EXISTS idx_travel_plans_updated_at ON travel_plans(updated_at);
+    CREATE INDEX IF NOT EXISTS idx_travel_plans_created_at_id ON travel_plans(created_at, id);
+    CREATE INDEX IF NOT EXISTS idx_locations_visit_order_id ON locations(visit_order, id);
+    """
+
+    location_trigger_sql = """
+    CREATE OR REPLACE FUNCTION update_location_updated_at_column()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = NOW();
+        RETURN NEW;
+    END;
+    $$ language 'plpgsql';
+
+    DROP TRIGGER IF EXISTS update_locations_modtime ON locations;
+    CREATE TRIGGER update_locations_modtime
+    BEFORE UPDATE ON locations
+    FOR EACH ROW
+    EXECUTE FUNCTION update_location_updated_at_column();
+    """
+
+    change_log_trigger_sql = """
+    CREATE OR REPLACE FUNCTION record_change()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        rec RECORD;
+        plan_id UUID;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            rec := OLD;
+        ELSE
+            rec := NEW;
+        END IF;
+
+        IF TG_TABLE_NAME = 'travel_plans' THEN
+            plan_id := rec.id;
+        ELSE
+            plan_id := rec.travel_plan_id;
+        END IF;
+
+        INSERT INTO change_log (entity_type, entity_id, travel_plan_id, operation)
+        VALUES (
+            TG_ARGV[0], rec.id, plan_id,
+            CASE WHEN TG_OP = 'DELETE' THEN 'delete' ELSE 'upsert' END
+        );
+        -- Однакові NOTIFY в межах транзакції PostgreSQL об'єднує в одне
+        PERFORM pg_notify('travel_changes', TG_ARGV[0]);
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+
+    DROP TRIGGER IF EXISTS record_travel_plans_change ON travel_plans;
+    CREATE TRIGGER record_travel_plans_change
+    AFTER INSERT OR UPDATE OR DELETE ON travel_plans
+    FOR EACH ROW
+    EXECUTE FUNCTION record_change('travel_plan');
+
+    DROP TRIGGER IF EXISTS record_locations_change ON locations;
+    CREATE TRIGGER record_locations_change
+    AFTER INSERT OR UPDATE OR DELETE ON locations
+    FOR EACH ROW
+    EXECUTE FUNCTION record_change('location');
+    """
+
+    return schema_sql, location_trigger_sql, change_log_trigger_sql
+
+
+def create_catalog_sql():
+    """
+    Повертає SQL для materialized view каталогу публічних планів
+    """
+    catalog_sql = """
+    -- Каталог публічних планів (materialized view, оновлюється CONCURRENTLY)
+    CREATE MATERIALIZED VIEW IF NOT EXISTS public_plan_catalog AS
+    SELECT
+        p.id,
+        p.title,
+        p.description,
+        p.start_date,
+        p.end_date,
+        p.budget,
+        p.currency,
+        p.created_at,
+        p.updated_at,
+        COUNT(l.id) AS location_count,
+        COALESCE(SUM(l.budget), 0) AS locations_budget,
+        MIN(l.arrival_date) AS first_arrival,
+        MAX(l.departure_date) AS last_departure
+    FROM travel_plans p
+    LEFT JOIN locations l ON l.travel_plan_id = p.id
+    WHERE p.is_public
+    GROUP BY p.id;
+
+    -- Унікальний індекс обов'язковий для REFRESH MATERIALIZED VIEW CONCURRENTLY
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_public_plan_catalog_id ON public_plan_catalog(id);
+    CREATE INDEX IF NOT EXISTS idx_public_plan_catalog_recent ON public_plan_catalog(updated_at DESC, id);
+    CREATE INDEX IF NOT EXISTS idx_public_plan_catalog_popular ON public_plan_catalog(location_count DESC, updated_at DESC, id);
+    """
+
+    return catalog_sql
+
+
+def apply_strict_schedule(conn):
+    """
+    Додає exclusion constraint, що забороняє перекриття візитів у межах плану.
+    PostgreSQL < 17 не підтримує exclusion constraints на партиціонованих таблицях,
+    тому для них обмеження додається на кожну партицію (ключ партиціонування -
+    travel_plan_id, тож перевірка еквівалентна).
+    """
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+    if locations_kind(conn) == "p":
+        tables = conn.execute(text(
+            "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = 'locations'::regclass"
+        )).scalars().all()
+    else:
+        tables = ["locations"]
+
+    for table in tables:
+        exists = conn.execute(text(
+            "SELECT 1 FROM pg_constraint WHERE conname = :name AND conrelid = CAST(:table AS regclass)"
+        ), {"name": f"{table}_no_overlap", "table": table}).scalar()
+        if exists:
+            continue
+        conn.execute(text(f"""
+            ALTER TABLE {table} ADD CONSTRAINT {table}_no_overlap
+            EXCLUDE USING gist (
+                travel_plan_id WITH =,
+                tstzrange(arrival_date, departure_date) WITH &&
+            )
+            WHERE (arrival_date IS NOT NULL AND departure_date IS NOT NULL)
+        """))
+
+
+def init_db(partitions: int = 0):
+    """
+    Створює всі таблиці в базі даних, функції та тригери.
+    partitions > 0 - нова таблиця locations створюється hash-партиціонованою
     """
     try:
         print("Спроба підключення до бази даних...")
         
         # Створюємо таблиці
-        Base.metadata.create_all(bind=engine)
-        print("[OK] Створено таблиці: travel_plans, locations")
+        if partitions > 0:
+            tables = [t for t in Base.metadata.sorted_tables if t.name != Location.__tablename__]
+            Base.metadata.create_all(bind=engine, tables=tables)
+            with engine.begin() as conn:
+                kind = locations_kind(conn)
+                if kind is None:
+                    create_partitioned_locations(conn, partitions)
+                    print(f"[OK] Створено таблицю locations з {partitions} hash-партиціями")
+                elif kind != "p":
+                    print("[WARN] locations - звичайна таблиця; для переходу запустіть "
+                          "python -m app.db_init --migrate-partitioned-locations")
+        else:
+            Base.metadata.create_all(bind=engine)
+        print("[OK] Створено таблиці: travel_plans, locations, change_log, change_log_horizon")
         
         # Створюємо функцію та тригер для updated_at
         with engine.begin() as conn:
@@ -62,6 +221,27 @@ def init_db():
             # Створюємо тригер
             conn.execute(text(trigger_sql))
             print("[OK] Створено тригер update_travel_plans_modtime")
+
+            # Change feed: updated_at для locations та журнал змін
+            schema_sql, location_trigger_sql, change_log_trigger_sql = create_change_feed_sql()
+            conn.execute(text(schema_sql))
+            conn.execute(text(location_trigger_sql))
+            print("[OK] Створено тригер update_locations_modtime")
+            conn.execute(text(change_log_trigger_sql))
+            print("[OK] Створено тригери change_log")
+
+            conn.execute(text(create_catalog_sql()))
+            print("[OK] Створено materialized view public_plan_catalog")
+
+        if settings.STRICT_SCHEDULE:
+            # Окрема транзакція: існуючі перекриття не повинні зривати решту ініціалізації
+            try:
+                with engine.begin() as conn:
+                    apply_strict_schedule(conn)
+                print("[OK] Увімкнено strict-режим розкладу (exclusion constraint)")
+            except IntegrityError as e:
+                print(f"[WARN] Не вдалося увімкнути strict-режим: в існуючих планах є перекриття ({e.orig})")
+                print("       Перегляньте GET /api/travel-plans/{id}/conflicts та виправте дати")
         
         print("[OK] База даних успішно ініціалізована!")
         print("[OK] Всі таблиці, constraints, індекси та тригери створені")
@@ -76,6 +256,33 @@ def init_db():
         sys.exit(1)
 
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ініціалізація бази даних")
+    parser.add_argument(
+        "--partitions", type=int, default=settings.LOCATIONS_PARTITIONS,
+        help="Кількість hash-партицій locations (0 - звичайна таблиця)"
+    )
+    parser.add_argument(
+        "--migrate-partitioned-locations", action="store_true",
+        help="Онлайн-міграція існуючої таблиці locations у hash-партиціоновану"
+    )
+    parser.add_argument("--batch-size", type=int, default=10000, help="Розмір батчу копіювання при міграції")
+    parser.add_argument("--drop-legacy", action="store_true", help="Видалити стару таблицю після міграції")
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
-    init_db()
+    args = parse_args()
+    if SHARDING_ENABLED:
+        # init_db та міграція партицій працюють з DATABASE_URL, а не з шардами
+        print("[ERROR] У шардованому режимі схему кожного шарду створює python -m app.migrations; "
+              "app.db_init працює лише з однією БД (DATABASE_URL)")
+        sys.exit(1)
+    if args.migrate_partitioned_locations:
+        if args.partitions <= 0:
+            print("[ERROR] Вкажіть --partitions або LOCATIONS_PARTITIONS > 0")
+            sys.exit(1)
+        migrate_locations_to_partitioned(args.partitions, args.batch_size, args.drop_legacy)
+    else:
+        init_db(args.partitions)
 
@@ -0,0 +1,144 @@
+"""
+Readiness: фонова задача періодично перевіряє БД (SELECT 1) та стан пулу,
+/ready лише віддає закешований результат і не робить запитів до БД.
+
+Цей же сигнал замінює pool_pre_ping: пул без pre-ping може віддати з'єднання,
+яке вже розірване. Помилка розриву (у запиті чи в пробі) інвалідує пул
+(стандартна обробка SQLAlchemy), тут ми додатково одразу позначаємо воркер
+неготовим, скидаємо idle-з'єднання та запускаємо позачергову пробу.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.database import SHARDING_ENABLED, data_engines
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseHealth:
+
+    def __init__(self):
+        self._state: Optional[dict] = None
+        self._checked_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def is_ready(self) -> bool:
+        if self._state is None or self._state["status"] != "ok":
+            return False
+        return time.monotonic() - self._checked_at <= settings.READY_MAX_AGE
+
+    def snapshot(self) -> dict:
+        if self._state is None:
+            return {"status": "unknown"}
+        return {**self._state, "age_s": round(time.monotonic() - self._checked_at, 3)}
+
+    def _engine_pool_stats(self, target) -> dict:
+        stats = {}
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(target.pool, name, None)
+            if method is not None:
+                stats[name] = method()
+        return stats
+
+    def _pool_stats(self):
+        stats = [self._engine_pool_stats(target) for target in data_engines()]
+        return stats if SHARDING_ENABLED else stats[0]
+
+    def _select_one(self, target):
+        with target.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def probe(self):
+        """
+        Перевіряє з'єднання з БД (у шардованому режимі - з кожним шардом). Виконується в threadpool
+        """
+        started = time.perf_counter()
+        for index, target in enumerate(data_engines()):
+            try:
+                try:
+                    self._select_one(target)
+                except DBAPIError as e:
+                    if not e.connection_invalidated:
+                        raise
+                    # Розірване з'єднання з пулу - пул уже інвалідовано, пробуємо нове
+                    self._select_one(target)
+            except Exception as e:
+                error = str(getattr(e, "orig", None) or e)
+                self._set_failed(f"shard {index}: {error}" if SHARDING_ENABLED else error)
+                target.dispose()
+                return
+
+        self._state = {
+            "status": "ok",
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "pool": self._pool_stats(),
+        }
+        self._checked_at = time.monotonic()
+
+    def _set_failed(self, error: str):
+        self._state = {
+            "status": "unavailable",
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+            "error": error,
+            "pool": self._pool_stats(),
+        }
+        self._checked_at = time.monotonic()
+
+    def on_disconnect(self, error: str):
+        """
+        Викликається з потоку запиту, що отримав помилку розриву з'єднання
+        """
+        self._set_failed(error)
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        while True:
+            # Скидаємо до проби: сигнал, що прийде під час неї, запустить наступну пробу одразу
+            self._wake.clear()
+            await run_in_threadpool(self.probe)
+            if self._state["status"] != "ok":
+                logger.warning("Database unavailable: %s", self._state.get("error"))
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.READY_PROBE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._loop = None
+
+
+db_health = DatabaseHealth()
+
+
+def _handle_disconnect(exception_context):
+    if exception_context.is_disconnect:
+        db_health.on_disconnect(str(exception_context.original_exception))
+
+
+for _engine in data_engines():
+    event.listen(_engine, "handle_error", _handle_disconnect)
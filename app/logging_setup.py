@@ -0,0 +1,217 @@
+"""
+Структуроване JSON-логування з QueueHandler: запит лише кладе LogRecord у чергу,
+форматування та запис виконує фоновий потік QueueListener.
+
+AccessLogMiddleware пише один запис на запит: request_id, шаблон маршруту,
+статус, тривалість та час у БД. Успішні швидкі запити семплюються
+(LOG_SUCCESS_SAMPLE_RATE), помилки та повільні запити логуються завжди.
+"""
+import json
+import logging
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+access_logger = logging.getLogger("app.access")
+
+# Стандартні атрибути LogRecord - все інше вважаємо структурованими полями
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class RequestStats:
+    __slots__ = ("request_id", "db_time", "db_queries")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.db_time = 0.0
+        self.db_queries = 0
+
+
+# Змінюваний об'єкт у ContextVar: threadpool та дочірні задачі отримують копію
+# контексту, але з посиланням на той самий об'єкт, тож час БД додається до запиту
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        stats = getattr(record, "_request_stats", None)
+        if stats is not None:
+            entry["request_id"] = stats.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(QueueHandler):
+    """
+    Черга в межах процесу, тому record не потрібно серіалізувати:
+    на шляху запиту лише фіксуємо request_id і кладемо record у чергу
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not hasattr(record, "_request_stats"):
+            record._request_stats = request_stats.get()
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging():
+    """
+    Налаштовує root, uvicorn та SQLAlchemy логери на запис через чергу
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = _ContextQueueHandler(log_queue)
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL)
+
+    # uvicorn та SQL echo пишуть через ту саму чергу; стандартний access log
+    # uvicorn замінює AccessLogMiddleware
+    for name in ("uvicorn", "uvicorn.error", "sqlalchemy.engine.Engine"):
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+    uvicorn_access = logging.getLogger("uvicorn.access")
+    uvicorn_access.handlers = []
+    uvicorn_access.propagate = False
+    uvicorn_access.disabled = True
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Зупиняє фоновий потік, дописавши всі записи з черги
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def instrument_engine(engine):
+    """
+    Рахує час та кількість SQL-запитів поточного HTTP-запиту
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        stats = request_stats.get()
+        if stats is not None:
+            stats.db_time += time.perf_counter() - started
+            stats.db_queries += 1
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def _route_template(scope) -> Optional[str]:
+    endpoint = scope.get("endpoint")
+    router = scope.get("router")
+    if endpoint is None or router is None:
+        return None
+    for route in router.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return None
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware: request ID (X-Request-ID), облік часу та access log
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        stats = RequestStats(request_id or uuid.uuid4().hex)
+        token = request_stats.set(stats)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", stats.request_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            request_stats.reset(token)
+            self._log(scope, status_code, duration, stats)
+
+    def _log(self, scope, status_code: int, duration: float, stats: RequestStats):
+        slow = duration * 1000 >= settings.LOG_SLOW_REQUEST_MS
+        if status_code < 400 and not slow and random.random() >= settings.LOG_SUCCESS_SAMPLE_RATE:
+            return
+        level = logging.ERROR if status_code >= 500 else logging.WARNING if (status_code >= 400 or slow) else logging.INFO
+        access_logger.log(
+            level,
+            "%s %s %s",
+            scope["method"], scope["path"], status_code,
+            extra={
+                "_request_stats": stats,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": _route_template(scope),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "db_time_ms": round(stats.db_time * 1000, 2),
+                "db_queries": stats.db_queries,
+            }
+        )
@@ -0,0 +1,178 @@
+"""
+Перевірка схеми при старті контейнера (замість python -m app.db_init на кожен запуск).
+
+Швидкий шлях: ревізія в alembic_version збігається з head - жодного DDL
+і жодних блокувань, лише одне читання. Head визначається розбором файлів
+alembic/versions без імпорту alembic (сам імпорт alembic - ~150 мс).
+
+Повільний шлях виконується під advisory lock, бо кілька контейнерів
+можуть стартувати одночасно:
+  - порожня БД або стара ревізія -> alembic upgrade head;
+  - БД, створена раніше через app.db_init або db/migrations/*.sql
+    (таблиці є, alembic_version немає) -> ідемпотентний init_db та alembic stamp head.
+Alembic та app.db_init імпортуються лише на повільному шляху.
+У шардованому режимі перевіряється та мігрується кожен шард.
+
+    python -m app.migrations          # перевірка та міграція
+    python -m app.migrations --head   # вивести head-ревізію (для docker-entrypoint.sh)
+"""
+import argparse
+import ast
+import sys
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine, data_engines, SHARDING_ENABLED
+
+PROJECT_ROOT = Path(__file__).parent.parent
+VERSIONS_DIR = PROJECT_ROOT / "alembic" / "versions"
+
+# Довільний, але фіксований ключ advisory lock для міграцій
+MIGRATION_LOCK_KEY = 720_037
+
+
+def _module_constants(path: Path) -> dict:
+    constants = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets = [node.target]
+        elif isinstance(node, ast.Assign):
+            targets = node.targets
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                constants[target.id] = ast.literal_eval(node.value)
+    return constants
+
+
+def head_revision() -> Optional[str]:
+    """
+    Ревізія, на яку не посилається жодна інша (без імпорту alembic)
+    """
+    revisions = set()
+    parents = set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        constants = _module_constants(path)
+        if "revision" not in constants:
+            continue
+        revisions.add(constants["revision"])
+        down = constants.get("down_revision")
+        if isinstance(down, (tuple, list)):
+            parents.update(down)
+        elif down is not None:
+            parents.add(down)
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise RuntimeError(f"Кілька head-ревізій: {sorted(heads)}")
+    return next(iter(heads), None)
+
+
+def current_revision(conn) -> Optional[str]:
+    if not conn.execute(text("SELECT to_regclass('alembic_version') IS NOT NULL")).scalar():
+        return None
+    return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _alembic_config(conn):
+    from alembic.config import Config
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    # Міграції виконуються на з'єднанні, що тримає advisory lock
+    config.attributes["connection"] = conn
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def _migrate(target, head: str):
+    from alembic import command
+
+    with target.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        conn.commit()
+        try:
+            # Інший контейнер міг виконати міграцію, поки ми чекали блокування
+            current = current_revision(conn)
+            legacy = current is None and conn.execute(
+                text("SELECT to_regclass('travel_plans') IS NOT NULL")
+            ).scalar()
+            conn.commit()
+
+            if current == head:
+                print(f"[OK] Схему вже оновлено до {head}")
+            elif legacy:
+                if target is not engine:
+                    raise RuntimeError(f"{target.url.render_as_string()}: таблиці без alembic_version - "
+                                       "ініціалізуйте шард через alembic upgrade head на порожній БД")
+                from app.db_init import init_db
+                print("[..] Знайдено схему без alembic_version - оновлюємо через init_db")
+                init_db(settings.LOCATIONS_PARTITIONS)
+                command.stamp(_alembic_config(conn), "head")
+                print(f"[OK] Схему позначено ревізією {head}")
+            else:
+                command.upgrade(_alembic_config(conn), "head")
+                print(f"[OK] Міграції застосовано: {current or '<порожня БД>'} -> {head}")
+            conn.commit()
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+
+
+def _ensure_strict_schedule(target):
+    with target.connect() as conn:
+        applied = conn.execute(text(
+            "SELECT EXISTS (SELECT 1 FROM pg_constraint WHERE contype = 'x' AND conname LIKE 'locations%_no_overlap')"
+        )).scalar()
+    if applied:
+        return
+
+    from sqlalchemy.exc import IntegrityError
+    from app.db_init import apply_strict_schedule
+    try:
+        with target.begin() as conn:
+            apply_strict_schedule(conn)
+        print("[OK] Увімкнено strict-режим розкладу (exclusion constraint)")
+    except IntegrityError as e:
+        print(f"[WARN] Не вдалося увімкнути strict-режим: в існуючих планах є перекриття ({e.orig})")
+
+
+def ensure_schema():
+    """
+    Застосовує міграції лише якщо ревізія БД відрізняється від head
+    """
+    head = head_revision()
+    for index, target in enumerate(data_engines()):
+        if SHARDING_ENABLED:
+            print(f"Шард {index}: {target.url.render_as_string()}")
+        with target.connect() as conn:
+            current = current_revision(conn)
+
+        if current == head:
+            print(f"[OK] Схема актуальна ({head}), DDL пропущено")
+        else:
+            _migrate(target, head)
+
+        if settings.STRICT_SCHEDULE:
+            _ensure_strict_schedule(target)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Перевірка та міграція схеми БД")
+    parser.add_argument("--head", action="store_true", help="Вивести head-ревізію та завершити")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.head:
+        print(head_revision())
+        sys.exit(0)
+    try:
+        ensure_schema()
+    except Exception as e:
+        print(f"[ERROR] Помилка перевірки схеми: {e}")
+        sys.exit(1)
@@ -1,4 +1,5 @@
 from app.models.travel_plan import TravelPlan
 from app.models.location import Location
+from app.models.change_log import ChangeLog, ChangeLogHorizon
 
-__all__ = ["TravelPlan", "Location"]
+__all__ = ["TravelPlan", "Location", "ChangeLog", "ChangeLogHorizon"]
@@ -0,0 +1,43 @@
+from sqlalchemy import Column, String, BigInteger, Boolean, DateTime, CheckConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """
+    Журнал змін travel_plans та locations (заповнюється тригерами).
+    Записи з operation='delete' є tombstones для видалених рядків.
+    """
+    __tablename__ = "change_log"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    # ID транзакції, що внесла зміну; порядок (txid, id) використовується як курсор
+    txid = Column(BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text)::bigint"))
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    travel_plan_id = Column(UUID(as_uuid=True), nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("entity_type IN ('travel_plan', 'location')", name='change_log_entity_type_check'),
+        CheckConstraint("operation IN ('upsert', 'delete')", name='change_log_operation_check'),
+        Index('idx_change_log_txid_id', 'txid', 'id'),
+    )
+
+
+class ChangeLogHorizon(Base):
+    """
+    Позиція (txid, id) останнього видаленого з change_log запису (один рядок).
+    Токени change feed, старші за неї, недійсні - клієнту потрібна повна ресинхронізація.
+    """
+    __tablename__ = "change_log_horizon"
+
+    id = Column(Boolean, primary_key=True, server_default=text("true"))
+    txid = Column(BigInteger, nullable=False)
+    change_id = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("id", name='change_log_horizon_single_row_check'),
+    )
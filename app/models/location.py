@@ -21,6 +21,7 @@ class Location(Base):
     budget = Column(Numeric(10, 2), nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Зв'язок з travel_plan
     travel_plan = relationship("TravelPlan", back_populates="locations")
@@ -34,5 +35,7 @@ class Location(Base):
         CheckConstraint('budget >= 0', name='location_budget_check'),
         CheckConstraint('departure_date >= arrival_date', name='check_location_dates'),
         Index('idx_locations_travel_plan_id', 'travel_plan_id'),
+        Index('idx_locations_updated_at', 'updated_at'),
+        Index('idx_locations_visit_order_id', 'visit_order', 'id'),
     )
 
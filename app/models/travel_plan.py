@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Date, Numeric, Boolean, Integer, DateTime, CheckConstraint
+from sqlalchemy import Column, String, Text, Date, Numeric, Boolean, Integer, DateTime, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -31,5 +31,8 @@ class TravelPlan(Base):
         CheckConstraint('budget >= 0', name='travel_plan_budget_check'),
         CheckConstraint('version > 0', name='travel_plan_version_check'),
         CheckConstraint('end_date >= start_date', name='check_plan_dates'),
+        Index('idx_travel_plans_updated_at', 'updated_at'),
+        # Порядок сторінок у шардованому режимі (ORDER BY created_at, id LIMIT на кожному шарді)
+        Index('idx_travel_plans_created_at_id', 'created_at', 'id'),
     )
 
@@ -0,0 +1,291 @@
+"""
+Hash-партиціонування таблиці locations за travel_plan_id (опціонально).
+
+Первинний ключ партиціонованої таблиці - (id, travel_plan_id), бо PostgreSQL
+вимагає, щоб він містив ключ партиціонування. Модель Location та роутери
+не змінюються: ORM і далі ідентифікує локацію за id.
+
+Онлайн-міграція з звичайної таблиці:
+  1. створюється locations_partitioned та тригер, що дзеркалює в неї всі зміни;
+  2. існуючі рядки копіюються батчами (кожен батч - окрема транзакція);
+  3. коротка транзакція під ACCESS EXCLUSIVE блокуванням прибирає рядки,
+     видалені під час копіювання, та перейменовує таблиці.
+Стара таблиця залишається як locations_legacy (видаляється вручну або --drop-legacy).
+
+Логічна реплікація: publication містить явний список таблиць, тому службові
+таблиці міграції (їх немає на репліках) не публікуються. Членство в publication
+прив'язане до OID, тож при переключенні стара таблиця (вже locations_legacy)
+замінюється в publication новою locations у тій же транзакції; репліки отримують
+зміни від імені кореня (publish_via_partition_root) у свою звичайну locations.
+З FOR ALL TABLES publication міграція не запускається.
+"""
+import time
+
+from sqlalchemy import (
+    MetaData, Table, CheckConstraint, PrimaryKeyConstraint, ForeignKeyConstraint, text
+)
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.database import engine
+from app.models import Location, TravelPlan
+
+MIGRATION_TABLE = "locations_partitioned"
+DELETED_TABLE = "locations_migration_deleted"
+PUBLICATION = "travel_planner_pub"
+
+COLUMNS = [c.name for c in Location.__table__.columns]
+
+
+def partitioned_locations_table(name: str) -> Table:
+    """
+    Будує партиціоновану версію locations з колонок та CHECK-обмежень моделі
+    """
+    metadata = MetaData()
+    TravelPlan.__table__.to_metadata(metadata)
+
+    columns = []
+    for column in Location.__table__.columns:
+        copy = column._copy()
+        copy.primary_key = False
+        columns.append(copy)
+
+    checks = [
+        CheckConstraint(c.sqltext, name=c.name)
+        for c in Location.__table__.constraints
+        if isinstance(c, CheckConstraint)
+    ]
+
+    return Table(
+        name, metadata, *columns, *checks,
+        PrimaryKeyConstraint("id", "travel_plan_id", name=f"{name}_pkey"),
+        ForeignKeyConstraint(
+            ["travel_plan_id"], ["travel_plans.id"],
+            ondelete="CASCADE", name="locations_travel_plan_id_fkey"
+        ),
+        postgresql_partition_by="HASH (travel_plan_id)",
+    )
+
+
+def create_partitioned_locations(conn, partitions: int, name: str = "locations", index_prefix: str = "idx_locations"):
+    """
+    Створює партиціоновану таблицю, її партиції та індекси
+    """
+    partitioned_locations_table(name).create(conn)
+    for remainder in range(partitions):
+        conn.execute(text(
+            f"CREATE TABLE locations_p{remainder} PARTITION OF {name} "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        ))
+    conn.execute(text(f"CREATE INDEX {index_prefix}_travel_plan_id ON {name}(travel_plan_id)"))
+    conn.execute(text(f"CREATE INDEX {index_prefix}_updated_at ON {name}(updated_at)"))
+    conn.execute(text(f"CREATE INDEX {index_prefix}_visit_order_id ON {name}(visit_order, id)"))
+
+
+def locations_kind(conn):
+    """
+    'r' - звичайна таблиця, 'p' - партиціонована, None - таблиці немає
+    """
+    return conn.execute(text(
+        "SELECT relkind FROM pg_class WHERE oid = to_regclass('locations')"
+    )).scalar()
+
+
+def _mirror_trigger_sql() -> str:
+    column_list = ", ".join(COLUMNS)
+    new_values = ", ".join(f"NEW.{c}" for c in COLUMNS)
+    update_set = ", ".join(f"{c} = EXCLUDED.{c}" for c in COLUMNS if c not in ("id", "travel_plan_id"))
+    return f"""
+    CREATE OR REPLACE FUNCTION mirror_locations_to_partitioned()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.travel_plan_id <> NEW.travel_plan_id) THEN
+            DELETE FROM {MIGRATION_TABLE} WHERE id = OLD.id AND travel_plan_id = OLD.travel_plan_id;
+            INSERT INTO {DELETED_TABLE} (id) VALUES (OLD.id) ON CONFLICT DO NOTHING;
+            IF TG_OP = 'DELETE' THEN
+                RETURN NULL;
+            END IF;
+        END IF;
+        INSERT INTO {MIGRATION_TABLE} ({column_list}) VALUES ({new_values})
+        ON CONFLICT (id, travel_plan_id) DO UPDATE SET {update_set};
+        RETURN NULL;
+    END;
+    $$ language 'plpgsql';
+
+    DROP TRIGGER IF EXISTS mirror_locations_partitioned ON locations;
+    CREATE TRIGGER mirror_locations_partitioned
+    AFTER INSERT OR UPDATE OR DELETE ON locations
+    FOR EACH ROW
+    EXECUTE FUNCTION mirror_locations_to_partitioned();
+    """
+
+
+def _copy_batch(conn, last_id, batch_size: int):
+    column_list = ", ".join(COLUMNS)
+    return conn.execute(text(f"""
+        WITH batch AS (
+            SELECT {column_list} FROM locations
+            WHERE (CAST(:last_id AS uuid) IS NULL OR id > CAST(:last_id AS uuid))
+            ORDER BY id
+            LIMIT :batch_size
+        ), copied AS (
+            INSERT INTO {MIGRATION_TABLE} ({column_list})
+            SELECT {column_list} FROM batch
+            ON CONFLICT (id, travel_plan_id) DO NOTHING
+        )
+        SELECT id FROM batch ORDER BY id DESC LIMIT 1
+    """), {"last_id": last_id, "batch_size": batch_size}).scalar()
+
+
+def _cut_over(conn, drop_legacy: bool):
+    from app.db_init import create_change_feed_sql
+
+    conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+    conn.execute(text("LOCK TABLE locations IN ACCESS EXCLUSIVE MODE"))
+
+    # Рядки, видалені під час копіювання, могли бути скопійовані зі старого snapshot
+    conn.execute(text(f"""
+        DELETE FROM {MIGRATION_TABLE} p
+        USING {DELETED_TABLE} d
+        WHERE p.id = d.id AND NOT EXISTS (
+            SELECT 1 FROM locations l WHERE l.id = p.id AND l.travel_plan_id = p.travel_plan_id
+        )
+    """))
+    conn.execute(text("DROP TRIGGER mirror_locations_partitioned ON locations"))
+    conn.execute(text("DROP FUNCTION mirror_locations_to_partitioned()"))
+    # View посилається на таблицю за OID - перестворюється після переключення
+    conn.execute(text("DROP MATERIALIZED VIEW IF EXISTS public_plan_catalog"))
+
+    conn.execute(text("ALTER TABLE locations RENAME TO locations_legacy"))
+    conn.execute(text("DROP TRIGGER IF EXISTS update_locations_modtime ON locations_legacy"))
+    conn.execute(text("DROP TRIGGER IF EXISTS record_locations_change ON locations_legacy"))
+    for index in ("locations_pkey", "idx_locations_travel_plan_id", "idx_locations_updated_at",
+                  "idx_locations_visit_order_id"):
+        conn.execute(text(f"ALTER INDEX IF EXISTS {index} RENAME TO {index}_legacy"))
+
+    conn.execute(text(f"ALTER TABLE {MIGRATION_TABLE} RENAME TO locations"))
+    conn.execute(text(f"ALTER INDEX {MIGRATION_TABLE}_pkey RENAME TO locations_pkey"))
+    conn.execute(text(f"ALTER INDEX idx_{MIGRATION_TABLE}_travel_plan_id RENAME TO idx_locations_travel_plan_id"))
+    conn.execute(text(f"ALTER INDEX idx_{MIGRATION_TABLE}_updated_at RENAME TO idx_locations_updated_at"))
+    conn.execute(text(f"ALTER INDEX idx_{MIGRATION_TABLE}_visit_order_id RENAME TO idx_locations_visit_order_id"))
+    conn.execute(text(f"DROP TABLE {DELETED_TABLE}"))
+
+    _swap_published_locations(conn)
+
+    # Тригери updated_at та change_log переносимо на нову таблицю
+    _, location_trigger_sql, change_log_trigger_sql = create_change_feed_sql()
+    conn.execute(text(location_trigger_sql))
+    conn.execute(text(change_log_trigger_sql))
+
+    if drop_legacy:
+        conn.execute(text("DROP TABLE locations_legacy"))
+
+
+def _publication(conn):
+    """
+    (puballtables,) publication реплікації або None, якщо її немає
+    """
+    return conn.execute(text(
+        "SELECT puballtables FROM pg_publication WHERE pubname = :name"
+    ), {"name": PUBLICATION}).first()
+
+
+def _check_publication(conn):
+    publication = _publication(conn)
+    if publication is not None and publication.puballtables:
+        raise RuntimeError(
+            f"Publication {PUBLICATION} створена FOR ALL TABLES: службові таблиці міграції потрапили б "
+            "на репліки, яких у них немає. Перестворіть її з явним списком таблиць "
+            "(db/replications/publisher/100_create_publication.sql) і повторіть міграцію"
+        )
+
+
+def _swap_published_locations(conn):
+    """
+    Замінює в publication locations_legacy (стару таблицю за OID) новою locations
+    """
+    if _publication(conn) is None:
+        return
+    published = conn.execute(text(
+        "SELECT 1 FROM pg_publication_rel WHERE prpubid = (SELECT oid FROM pg_publication WHERE pubname = :name) "
+        "AND prrelid = 'locations_legacy'::regclass"
+    ), {"name": PUBLICATION}).scalar()
+    if published:
+        conn.execute(text(f"ALTER PUBLICATION {PUBLICATION} DROP TABLE locations_legacy"))
+        conn.execute(text(f"ALTER PUBLICATION {PUBLICATION} ADD TABLE locations"))
+
+
+def enable_partition_root_publishing(conn):
+    """
+    Репліки мають звичайну таблицю locations, тому публікуємо зміни від імені кореня
+    """
+    conn.execute(text(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_publication WHERE pubname = '{PUBLICATION}') THEN
+                ALTER PUBLICATION {PUBLICATION} SET (publish_via_partition_root = true);
+            END IF;
+        END
+        $$;
+    """))
+
+
+def migrate_locations_to_partitioned(partitions: int, batch_size: int = 10000, drop_legacy: bool = False):
+    """
+    Онлайн-міграція locations у hash-партиціоновану таблицю
+    """
+    with engine.begin() as conn:
+        kind = locations_kind(conn)
+        if kind == "p":
+            print("[OK] Таблиця locations вже партиціонована")
+            return
+        if kind is None:
+            raise RuntimeError("Таблиця locations не існує - запустіть ініціалізацію БД")
+        _check_publication(conn)
+
+        exists = conn.execute(text(f"SELECT to_regclass('{MIGRATION_TABLE}') IS NOT NULL")).scalar()
+        if not exists:
+            create_partitioned_locations(conn, partitions, name=MIGRATION_TABLE, index_prefix=f"idx_{MIGRATION_TABLE}")
+            print(f"[OK] Створено {MIGRATION_TABLE} з {partitions} партиціями")
+        conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DELETED_TABLE} (id UUID PRIMARY KEY)"))
+        conn.execute(text(_mirror_trigger_sql()))
+        print("[OK] Створено тригер дзеркалювання змін")
+
+    copied_batches = 0
+    last_id = None
+    while True:
+        with engine.begin() as conn:
+            last_id = _copy_batch(conn, last_id, batch_size)
+        if last_id is None:
+            break
+        copied_batches += 1
+        if copied_batches % 10 == 0:
+            print(f"[..] Скопійовано ~{copied_batches * batch_size} рядків")
+    print("[OK] Існуючі рядки скопійовано")
+
+    for attempt in range(1, 6):
+        try:
+            with engine.begin() as conn:
+                _cut_over(conn, drop_legacy)
+                enable_partition_root_publishing(conn)
+            break
+        except OperationalError as e:
+            # lock_timeout: таблиця зайнята довгою транзакцією, пробуємо ще раз
+            print(f"[WARN] Не вдалося отримати блокування (спроба {attempt}): {e.orig}")
+            time.sleep(attempt)
+    else:
+        raise RuntimeError("Не вдалося переключитися на партиціоновану таблицю; тригер дзеркалювання залишено")
+
+    from app.db_init import create_catalog_sql, apply_strict_schedule
+    with engine.begin() as conn:
+        conn.execute(text(create_catalog_sql()))
+    print("[OK] Перестворено materialized view public_plan_catalog")
+
+    if settings.STRICT_SCHEDULE:
+        with engine.begin() as conn:
+            apply_strict_schedule(conn)
+        print("[OK] Exclusion constraint розкладу додано на партиції")
+
+    print("[OK] locations переключено на hash-партиціоновану таблицю")
+    if not drop_legacy:
+        print("[OK] Стару таблицю збережено як locations_legacy")
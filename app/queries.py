@@ -0,0 +1,84 @@
+"""
+Попередньо побудовані statements для гарячих CRUD-запитів.
+
+Statement будується один раз при імпорті, параметри передаються через bindparam.
+SQLAlchemy мемоізує cache key на об'єкті statement, тож на кожен виклик
+не будується ні сам запит, ні його cache key, а скомпільований SQL береться
+з кешу компіляції engine.
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.models.location import Location
+from app.models.travel_plan import TravelPlan
+
+PLAN_BY_ID = select(TravelPlan).where(TravelPlan.id == bindparam("plan_id"))
+
+PLAN_BY_ID_AND_VERSION = PLAN_BY_ID.where(TravelPlan.version == bindparam("expected_version"))
+
+PLAN_VERSION = select(TravelPlan.version).where(TravelPlan.id == bindparam("plan_id"))
+
+PLAN_EXISTS = select(TravelPlan.id).where(TravelPlan.id == bindparam("plan_id"))
+
+LOCATION_BY_ID = select(Location).where(Location.id == bindparam("location_id"))
+
+PLAN_LOCATIONS = (
+    select(Location)
+    .where(Location.travel_plan_id == bindparam("plan_id"))
+    .order_by(Location.visit_order)
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+NEXT_VISIT_ORDER = select(
+    func.coalesce(func.max(Location.visit_order), 0) + 1
+).where(Location.travel_plan_id == bindparam("plan_id"))
+
+
+def get_travel_plan(db: Session, plan_id: UUID) -> Optional[TravelPlan]:
+    return db.execute(PLAN_BY_ID, {"plan_id": plan_id}).scalar_one_or_none()
+
+
+def get_travel_plan_version(db: Session, plan_id: UUID) -> Optional[int]:
+    return db.execute(PLAN_VERSION, {"plan_id": plan_id}).scalar()
+
+
+def update_travel_plan(db: Session, plan_id: UUID, expected_version: int, values: dict) -> Optional[TravelPlan]:
+    """
+    Optimistic locking одним запитом: UPDATE ... WHERE id AND version ... RETURNING.
+    None - плану немає або його версія вже інша. Набір колонок SET залежить
+    від запиту, тому statement будується на виклик (кешується за набором колонок)
+    """
+    params = {"plan_id": plan_id, "expected_version": expected_version}
+    if not values:
+        # Порожнє оновлення не змінює ні версію, ні updated_at
+        return db.execute(PLAN_BY_ID_AND_VERSION, params).scalar_one_or_none()
+    statement = (
+        update(TravelPlan)
+        .where(TravelPlan.id == bindparam("plan_id"), TravelPlan.version == bindparam("expected_version"))
+        .values(**values)
+        .returning(TravelPlan)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(statement, params).scalar_one_or_none()
+
+
+def travel_plan_exists(db: Session, plan_id: UUID) -> bool:
+    return db.execute(PLAN_EXISTS, {"plan_id": plan_id}).first() is not None
+
+
+def get_location(db: Session, location_id: UUID) -> Optional[Location]:
+    return db.execute(LOCATION_BY_ID, {"location_id": location_id}).scalar_one_or_none()
+
+
+def list_plan_locations(db: Session, plan_id: UUID, skip: int, limit: int) -> list[Location]:
+    return list(db.execute(
+        PLAN_LOCATIONS, {"plan_id": plan_id, "skip": skip, "limit": limit}
+    ).scalars())
+
+
+def next_visit_order(db: Session, plan_id: UUID) -> int:
+    return db.execute(NEXT_VISIT_ORDER, {"plan_id": plan_id}).scalar()
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from typing import List, Literal
+from app.database import get_db, SHARDING_ENABLED
+from app.catalog import catalog_snapshot, query_catalog, SORT_KEYS
+from app import sharding
+from app.schemas.catalog import CatalogEntry
+from app.dependencies import get_common_query_params
+
+router = APIRouter()
+
+_catalog_adapter = TypeAdapter(List[CatalogEntry])
+
+
+@router.get("/", response_model=List[CatalogEntry])
+async def get_catalog(
+    commons: dict = Depends(get_common_query_params),
+    sort: Literal["recent", "popular"] = Query("recent", description="Сортування: recent або popular"),
+    db: Session = Depends(get_db)
+):
+    """
+    Каталог публічних планів з кількістю локацій, бюджетами та датами
+    """
+    skip = commons["skip"]
+    limit = commons["limit"]
+
+    # Перші сторінки віддаються з пам'яті без звернення до БД
+    entries = catalog_snapshot.get(sort, skip, limit)
+    if entries is None and SHARDING_ENABLED:
+        error = sharding.skip_too_large(skip)
+        if error:
+            return error
+        pages = await sharding.fan_out(lambda shard_db: query_catalog(shard_db.connection(), sort, 0, skip + limit))
+        entries = sharding.merge_pages(pages, SORT_KEYS[sort], skip, limit)
+    elif entries is None:
+        entries = query_catalog(db.connection(), sort, skip, limit)
+    return Response(content=_catalog_adapter.dump_json(entries), media_type="application/json")
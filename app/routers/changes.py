@@ -0,0 +1,146 @@
+import asyncio
+import json
+from functools import partial
+from fastapi import APIRouter, Depends, Header, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.config import settings
+from app.database import get_db, SessionLocal, SHARDING_ENABLED
+from app.coalescing import single_flight
+from app.change_feed import fetch_changes, check_token, decode_token, notifier, InvalidChangeToken, ExpiredChangeToken
+from app.schemas.change import ChangeFeedResponse
+
+router = APIRouter()
+
+
+def _token_expired(e: ExpiredChangeToken) -> JSONResponse:
+    # Частину змін після токена вже видалено з журналу - клієнт має перезавантажити дані
+    return JSONResponse(
+        status_code=status.HTTP_410_GONE,
+        content={"error": str(e)}
+    )
+
+
+def _sharding_not_supported() -> JSONResponse:
+    # Курсор (txid, id) має сенс лише в межах однієї БД
+    return JSONResponse(
+        status_code=status.HTTP_501_NOT_IMPLEMENTED,
+        content={"error": "Change feed is not available in sharded mode"}
+    )
+
+
+@router.get("/", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: Optional[str] = Query(None, description="Токен з попередньої відповіді (next_token) або 'now' для поточного кінця журналу"),
+    limit: int = Query(100, ge=1, description="Максимальна кількість записів журналу"),
+    db: Session = Depends(get_db)
+):
+    """
+    Отримати зміни планів та локацій після токена since (включно з видаленнями)
+    """
+    if SHARDING_ENABLED:
+        return _sharding_not_supported()
+    try:
+        return fetch_changes(db, since, min(limit, settings.CHANGES_MAX_LIMIT))
+    except InvalidChangeToken as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": str(e)}
+        )
+    except ExpiredChangeToken as e:
+        return _token_expired(e)
+
+
+# SSE-потоки не проходять admission control, тому їхні читання обмежені окремо
+# (з'єднання з резерву DB_POOL_RESERVED). Потоки з однаковим токеном - зазвичай
+# усі, хто вже дочитав журнал, після кожного NOTIFY - ділять одне читання
+_stream_readers = asyncio.Semaphore(settings.CHANGES_STREAM_READERS)
+
+
+def _check_token(token: Optional[str]):
+    db = SessionLocal()
+    try:
+        check_token(db, token)
+    finally:
+        db.close()
+
+
+def _read_page(token: Optional[str]) -> ChangeFeedResponse:
+    db = SessionLocal()
+    try:
+        return fetch_changes(db, token, settings.CHANGES_MAX_LIMIT)
+    finally:
+        db.close()
+
+
+@router.get("/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="Токен, з якого почати потік"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events потік змін (LISTEN/NOTIFY з періодичним опитуванням як fallback)
+    """
+    if SHARDING_ENABLED:
+        return _sharding_not_supported()
+    token = last_event_id or since
+    try:
+        decode_token(token)
+        # До початку потоку: на відповідь 410 EventSource не перепідключається
+        async with _stream_readers:
+            await run_in_threadpool(_check_token, token)
+    except InvalidChangeToken as e:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"error": str(e)}
+        )
+    except ExpiredChangeToken as e:
+        return _token_expired(e)
+
+    async def event_stream():
+        nonlocal token
+        # Позиція, яку клієнт уже знає (надішле як Last-Event-ID при перепідключенні)
+        sent_id = last_event_id
+        wakeup = notifier.subscribe()
+        try:
+            await notifier.ensure_listening()
+            while not await request.is_disconnected():
+                wakeup.clear()
+                try:
+                    page = await single_flight.do(
+                        ("changes", token), partial(_read_page, token), limiter=_stream_readers
+                    )
+                except ExpiredChangeToken as e:
+                    # Потік відстав більше ніж на CHANGES_RETENTION
+                    yield f"event: expired\ndata: {json.dumps({'error': str(e)})}\n\n"
+                    return
+                token = page.next_token
+                # id кожної події - її власна позиція: після обриву посеред сторінки
+                # Last-Event-ID відновлює потік з наступної події
+                for change in page.changes:
+                    yield f"id: {change.token}\nevent: change\ndata: {change.model_dump_json()}\n\n"
+                    sent_id = change.token
+                if sent_id != token:
+                    # Кадр лише з id: порожня сторінка (напр. since=now) чи пропущені записи
+                    # кінця сторінки теж просувають Last-Event-ID, інакше перепідключення
+                    # з since=now втратило б зміни, зроблені під час обриву
+                    yield f"id: {token}\n\n"
+                    sent_id = token
+                if page.has_more:
+                    continue
+                await notifier.ensure_listening()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=settings.CHANGES_STREAM_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield f": keepalive\nid: {token}\n\n"
+        finally:
+            notifier.unsubscribe(wakeup)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,16 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List, Optional
+from pydantic import TypeAdapter
 from uuid import UUID
-from app.database import get_db
+from app.database import get_db, SHARDING_ENABLED
+from app.coalescing import single_flight
+from app import queries, sharding
 from app.models.location import Location
-from app.models.travel_plan import TravelPlan
 from app.schemas.location import LocationCreate, LocationUpdate, LocationResponse
 from app.dependencies import get_common_query_params
 
 router = APIRouter()
 
+_location_list_adapter = TypeAdapter(List[LocationResponse])
+
+
+def _load_plan_locations(travel_plan_id: UUID, skip: int, limit: int) -> bytes:
+    db = sharding.session_for_plan(travel_plan_id)
+    try:
+        locations = queries.list_plan_locations(db, travel_plan_id, skip, limit)
+        return _location_list_adapter.dump_json(
+            _location_list_adapter.validate_python(locations, from_attributes=True)
+        )
+    finally:
+        db.close()
+
+
+def _load_location(location_id: UUID) -> Optional[bytes]:
+    db = sharding.session_for_location(location_id)
+    try:
+        location = queries.get_location(db, location_id)
+        if not location:
+            return None
+        return LocationResponse.model_validate(location).model_dump_json().encode()
+    finally:
+        db.close()
+
 
 @router.get("/", response_model=List[LocationResponse])
 async def get_locations(
@@ -24,31 +50,47 @@ async def get_locations(
     skip = commons["skip"]
     limit = commons["limit"]
     
-    query = db.query(Location)
-    
     if travel_plan_id:
-        query = query.filter(Location.travel_plan_id == travel_plan_id)
+        # Популярні плани: однакові конкурентні запити ділять одне читання
+        body = await single_flight.do(
+            ("plan_locations", travel_plan_id, skip, limit),
+            lambda: _load_plan_locations(travel_plan_id, skip, limit)
+        )
+        return Response(content=body, media_type="application/json")
+
+    if SHARDING_ENABLED:
+        error = sharding.skip_too_large(skip)
+        if error:
+            return error
+
+        def load(shard_db: Session):
+            return shard_db.query(Location).order_by(
+                Location.visit_order, Location.id
+            ).limit(skip + limit).all()
+
+        pages = await sharding.fan_out(load)
+        return sharding.merge_pages(pages, lambda loc: (loc.visit_order, loc.id.int), skip, limit)
     
+    query = db.query(Location)
     locations = query.order_by(Location.visit_order).offset(skip).limit(limit).all()
     return locations
 
 
 @router.get("/{location_id}", response_model=LocationResponse)
 async def get_location(
-    location_id: UUID,
-    db: Session = Depends(get_db)
+    location_id: UUID
 ):
     """
     Отримати локацію за ID
     """
-    location = db.query(Location).filter(Location.id == location_id).first()
-    if not location:
+    body = await single_flight.do(("location", location_id), lambda: _load_location(location_id))
+    if body is None:
         from fastapi.responses import JSONResponse
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"error": f"Location with ID {location_id} not found"}
         )
-    return location
+    return Response(content=body, media_type="application/json")
 
 
 @router.post("/", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
@@ -59,28 +101,26 @@ async def create_location(
     """
     Створити нову локацію
     """
-    # Перевірка існування travel_plan
-    travel_plan = db.query(TravelPlan).filter(TravelPlan.id == location.travel_plan_id).first()
-    if not travel_plan:
-        from fastapi.responses import JSONResponse
-        return JSONResponse(
-            status_code=status.HTTP_404_NOT_FOUND,
-            content={"error": f"Travel plan with ID {location.travel_plan_id} not found"}
-        )
-    
-    # Автоматичне призначення visit_order, якщо не вказано
-    location_data = location.model_dump()
-    if not location_data.get('visit_order'):
-        max_order = db.query(func.max(Location.visit_order)).filter(
-            Location.travel_plan_id == location.travel_plan_id
-        ).scalar() or 0
-        location_data['visit_order'] = max_order + 1
-    
-    db_location = Location(**location_data)
-    db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
-    return db_location
+    # План відомий лише з тіла запиту - переходимо на його шард
+    with sharding.plan_session(location.travel_plan_id, db) as db:
+        # Перевірка існування travel_plan
+        if not queries.travel_plan_exists(db, location.travel_plan_id):
+            from fastapi.responses import JSONResponse
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"error": f"Travel plan with ID {location.travel_plan_id} not found"}
+            )
+
+        # Автоматичне призначення visit_order, якщо не вказано
+        location_data = location.model_dump()
+        if not location_data.get('visit_order'):
+            location_data['visit_order'] = queries.next_visit_order(db, location.travel_plan_id)
+
+        db_location = Location(id=sharding.new_id(db), **location_data)
+        db.add(db_location)
+        db.commit()
+        db.refresh(db_location)
+        return db_location
 
 
 @router.put("/{location_id}", response_model=LocationResponse)
@@ -92,7 +132,7 @@ async def update_location(
     """
     Оновити локацію за ID
     """
-    db_location = db.query(Location).filter(Location.id == location_id).first()
+    db_location = queries.get_location(db, location_id)
     if not db_location:
         from fastapi.responses import JSONResponse
         return JSONResponse(
@@ -117,7 +157,7 @@ async def delete_location(
     """
     Видалити локацію за ID
     """
-    db_location = db.query(Location).filter(Location.id == location_id).first()
+    db_location = queries.get_location(db, location_id)
     if not db_location:
         from fastapi.responses import JSONResponse
         return JSONResponse(
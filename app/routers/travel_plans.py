@@ -1,12 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from sqlalchemy import insert, select, literal
+from datetime import timedelta
 from typing import List, Optional
 from uuid import UUID
-from app.database import get_db
+from app.database import get_db, SHARDING_ENABLED
+from app.coalescing import single_flight
+from app import queries, sharding
 from app.models.travel_plan import TravelPlan
-from app.schemas.travel_plan import TravelPlanCreate, TravelPlanUpdate, TravelPlanResponse, TravelPlanWithLocations
-from app.schemas.location import LocationCreate, LocationResponse
+from app.models.location import Location
+from app.schemas.travel_plan import TravelPlanCreate, TravelPlanUpdate, TravelPlanResponse, TravelPlanWithLocations, TravelPlanClone
+from app.schemas.location import LocationCreate, LocationResponse, LocationConflict, ScheduleConflictReport
+from app.schedule import find_conflicts
 from app.dependencies import get_common_query_params
 
 router = APIRouter()
@@ -23,6 +29,21 @@ async def get_travel_plans(
     """
     skip = commons["skip"]
     limit = commons["limit"]
+
+    if SHARDING_ENABLED:
+        error = sharding.skip_too_large(skip)
+        if error:
+            return error
+
+        # Кожен шард повертає skip + limit планів, сторінка - після злиття
+        def load(shard_db: Session):
+            query = shard_db.query(TravelPlan)
+            if is_public is not None:
+                query = query.filter(TravelPlan.is_public == is_public)
+            return query.order_by(TravelPlan.created_at, TravelPlan.id).limit(skip + limit).all()
+
+        pages = await sharding.fan_out(load)
+        return sharding.merge_pages(pages, lambda p: (p.created_at, p.id.int), skip, limit)
     
     query = db.query(TravelPlan)
     
@@ -33,22 +54,77 @@ async def get_travel_plans(
     return travel_plans
 
 
+def _load_travel_plan(travel_plan_id: UUID) -> Optional[bytes]:
+    """
+    Завантажує план з локаціями та одразу серіалізує (результат спільний для single-flight)
+    """
+    db = sharding.session_for_plan(travel_plan_id)
+    try:
+        travel_plan = queries.get_travel_plan(db, travel_plan_id)
+        if not travel_plan:
+            return None
+        return TravelPlanWithLocations.model_validate(travel_plan).model_dump_json().encode()
+    finally:
+        db.close()
+
+
 @router.get("/{travel_plan_id}", response_model=TravelPlanWithLocations)
 async def get_travel_plan(
+    travel_plan_id: UUID
+):
+    """
+    Отримати план подорожі за ID з усіма локаціями
+    """
+    body = await single_flight.do(
+        ("travel_plan", travel_plan_id),
+        lambda: _load_travel_plan(travel_plan_id)
+    )
+    if body is None:
+        from fastapi.responses import JSONResponse
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": f"Travel plan with ID {travel_plan_id} not found"}
+        )
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/{travel_plan_id}/conflicts", response_model=ScheduleConflictReport)
+async def get_travel_plan_conflicts(
     travel_plan_id: UUID,
     db: Session = Depends(get_db)
 ):
     """
-    Отримати план подорожі за ID з усіма локаціями
+    Звіт про перекриття візитів (arrival_date/departure_date) між локаціями плану
     """
-    travel_plan = db.query(TravelPlan).filter(TravelPlan.id == travel_plan_id).first()
-    if not travel_plan:
+    if not queries.travel_plan_exists(db, travel_plan_id):
         from fastapi.responses import JSONResponse
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"error": f"Travel plan with ID {travel_plan_id} not found"}
         )
-    return travel_plan
+
+    locations = db.query(Location).filter(
+        Location.travel_plan_id == travel_plan_id,
+        Location.arrival_date.isnot(None),
+        Location.departure_date.isnot(None)
+    ).all()
+
+    conflicts = [
+        LocationConflict(
+            location_id=first.id,
+            location_name=first.name,
+            other_location_id=second.id,
+            other_location_name=second.name,
+            overlap_start=max(first.arrival_date, second.arrival_date),
+            overlap_end=min(first.departure_date, second.departure_date),
+        )
+        for first, second in find_conflicts(locations)
+    ]
+    return ScheduleConflictReport(
+        travel_plan_id=travel_plan_id,
+        checked_locations=len(locations),
+        conflicts=conflicts
+    )
 
 
 @router.post("/", response_model=TravelPlanResponse, status_code=status.HTTP_201_CREATED)
@@ -59,7 +135,8 @@ async def create_travel_plan(
     """
     Створити новий план подорожі
     """
-    db_travel_plan = TravelPlan(**travel_plan.model_dump())
+    # id задаємо явно: у шардованому режимі він визначає шард плану
+    db_travel_plan = TravelPlan(id=sharding.new_id(db), **travel_plan.model_dump())
     db.add(db_travel_plan)
     db.commit()
     db.refresh(db_travel_plan)
@@ -75,40 +152,42 @@ async def update_travel_plan(
     """
     Оновити план подорожі за ID (з optimistic locking)
     """
-    db_travel_plan = db.query(TravelPlan).filter(TravelPlan.id == travel_plan_id).first()
-    if not db_travel_plan:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"План подорожі з ID {travel_plan_id} не знайдено"
-        )
-    
     # Optimistic locking перевірка
     if travel_plan_update.version is None:
+        if not queries.travel_plan_exists(db, travel_plan_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"План подорожі з ID {travel_plan_id} не знайдено"
+            )
         from fastapi.responses import JSONResponse
         return JSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={"error": "Validation error: Version is required for update"}
         )
     
-    if travel_plan_update.version != db_travel_plan.version:
+    # Виключаємо version з оновлення, бо його оновлює тригер автоматично
+    update_data = travel_plan_update.model_dump(exclude_unset=True, exclude={'version'})
+    # Перевірка версії та оновлення одним UPDATE ... RETURNING, без блокування рядка між запитами
+    db_travel_plan = queries.update_travel_plan(db, travel_plan_id, travel_plan_update.version, update_data)
+    if db_travel_plan is None:
+        current_version = queries.get_travel_plan_version(db, travel_plan_id)
+        db.rollback()
+        if current_version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"План подорожі з ID {travel_plan_id} не знайдено"
+            )
         from fastapi.responses import JSONResponse
         return JSONResponse(
             status_code=status.HTTP_409_CONFLICT,
             content={
                 "error": "Conflict: Travel plan has been modified by another user",
-                "current_version": db_travel_plan.version
+                "current_version": current_version
             }
         )
     
-    # Виключаємо version з оновлення, бо його оновлює тригер автоматично
-    update_data = travel_plan_update.model_dump(exclude_unset=True, exclude={'version'})
-    for field, value in update_data.items():
-        setattr(db_travel_plan, field, value)
-    
-    # Версія та updated_at оновлюються автоматично через тригер
-    
+    # Версія та updated_at оновлені тригером і повернуті через RETURNING
     db.commit()
-    db.refresh(db_travel_plan)
     return db_travel_plan
 
 
@@ -120,7 +199,7 @@ async def delete_travel_plan(
     """
     Видалити план подорожі за ID (локації будуть видалені автоматично через CASCADE)
     """
-    db_travel_plan = db.query(TravelPlan).filter(TravelPlan.id == travel_plan_id).first()
+    db_travel_plan = queries.get_travel_plan(db, travel_plan_id)
     if not db_travel_plan:
         from fastapi.responses import JSONResponse
         return JSONResponse(
@@ -133,6 +212,65 @@ async def delete_travel_plan(
     return None
 
 
+@router.post("/{travel_plan_id}/clone", response_model=TravelPlanResponse, status_code=status.HTTP_201_CREATED)
+async def clone_travel_plan(
+    travel_plan_id: UUID,
+    overrides: TravelPlanClone,
+    db: Session = Depends(get_db)
+):
+    """
+    Клонувати план з усіма локаціями всередині PostgreSQL (INSERT ... SELECT в одній транзакції)
+    """
+    shift = timedelta(days=overrides.shift_days)
+
+    # id задаємо явно: Python-default uuid4 в INSERT ... SELECT дав би один id на всі рядки;
+    # у шардованому режимі нові id належать шарду вихідного плану
+    plan_columns = ["id", "title", "description", "start_date", "end_date", "budget", "currency", "is_public"]
+    plan_source = select(
+        sharding.new_id_sql(db),
+        literal(overrides.title) if overrides.title is not None else TravelPlan.title,
+        TravelPlan.description,
+        TravelPlan.start_date + overrides.shift_days,
+        TravelPlan.end_date + overrides.shift_days,
+        TravelPlan.budget,
+        TravelPlan.currency,
+        literal(overrides.is_public) if overrides.is_public is not None else TravelPlan.is_public,
+    ).where(TravelPlan.id == travel_plan_id)
+
+    new_plan_id = db.execute(
+        insert(TravelPlan).from_select(plan_columns, plan_source).returning(TravelPlan.id)
+    ).scalar()
+    if new_plan_id is None:
+        db.rollback()
+        from fastapi.responses import JSONResponse
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"error": f"Travel plan with ID {travel_plan_id} not found"}
+        )
+
+    location_columns = [
+        "id", "travel_plan_id", "name", "address", "latitude", "longitude", "visit_order",
+        "arrival_date", "departure_date", "budget", "notes",
+    ]
+    location_source = select(
+        sharding.new_id_sql(db),
+        literal(new_plan_id, Location.travel_plan_id.type),
+        Location.name,
+        Location.address,
+        Location.latitude,
+        Location.longitude,
+        Location.visit_order,
+        Location.arrival_date + shift,
+        Location.departure_date + shift,
+        Location.budget,
+        Location.notes,
+    ).where(Location.travel_plan_id == travel_plan_id)
+    db.execute(insert(Location).from_select(location_columns, location_source))
+
+    db.commit()
+    return db.get(TravelPlan, new_plan_id)
+
+
 # Endpoint для створення локації в межах плану подорожі
 @router.post("/{travel_plan_id}/locations", response_model=LocationResponse, status_code=status.HTTP_201_CREATED)
 async def create_location_for_plan(
@@ -147,8 +285,7 @@ async def create_location_for_plan(
     from app.schemas.location import LocationResponse
     
     # Перевірка існування travel_plan
-    travel_plan = db.query(TravelPlan).filter(TravelPlan.id == travel_plan_id).first()
-    if not travel_plan:
+    if not queries.travel_plan_exists(db, travel_plan_id):
         from fastapi.responses import JSONResponse
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -161,12 +298,9 @@ async def create_location_for_plan(
     
     # Автоматичне призначення visit_order, якщо не вказано
     if not location_data.get('visit_order'):
-        max_order = db.query(func.max(Location.visit_order)).filter(
-            Location.travel_plan_id == travel_plan_id
-        ).scalar() or 0
-        location_data['visit_order'] = max_order + 1
+        location_data['visit_order'] = queries.next_visit_order(db, travel_plan_id)
     
-    db_location = Location(**location_data)
+    db_location = Location(id=sharding.new_id(db), **location_data)
     db.add(db_location)
     db.commit()
     db.refresh(db_location)
@@ -0,0 +1,34 @@
+"""
+Пошук перекриттів візитів у плані за sort-and-sweep.
+
+Інтервали напіввідкриті [arrival_date, departure_date), як tstzrange за
+замовчуванням, тому візит, що починається в момент від'їзду з попереднього,
+не вважається перекриттям (так само поводиться exclusion constraint).
+"""
+import heapq
+from typing import Iterable
+
+from app.models.location import Location
+
+
+def find_conflicts(locations: Iterable[Location]) -> list[tuple[Location, Location]]:
+    """
+    Повертає пари локацій з перекритими візитами за O(n log n + k)
+    """
+    intervals = sorted(
+        (loc for loc in locations
+         if loc.arrival_date is not None and loc.departure_date is not None
+         and loc.departure_date > loc.arrival_date),
+        key=lambda loc: loc.arrival_date
+    )
+
+    conflicts = []
+    # Активні візити: (departure_date, порядковий номер, локація)
+    active: list = []
+    for index, location in enumerate(intervals):
+        while active and active[0][0] <= location.arrival_date:
+            heapq.heappop(active)
+        for _, _, other in active:
+            conflicts.append((other, location))
+        heapq.heappush(active, (location.departure_date, index, location))
+    return conflicts
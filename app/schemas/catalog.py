@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field, model_serializer
+from typing import Optional
+from datetime import date, datetime
+from uuid import UUID
+from decimal import Decimal
+
+
+class CatalogEntry(BaseModel):
+    id: UUID
+    title: str
+    description: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    budget: Optional[Decimal] = None
+    currency: str
+    location_count: int = Field(..., description="Кількість локацій у плані")
+    locations_budget: Decimal = Field(..., description="Сумарний бюджет локацій")
+    first_arrival: Optional[datetime] = Field(None, description="Найраніше прибуття")
+    last_departure: Optional[datetime] = Field(None, description="Найпізніший від'їзд")
+    created_at: datetime
+    updated_at: datetime
+
+    @model_serializer
+    def ser_model(self):
+        data = dict(self)
+        if data['budget'] is not None:
+            data['budget'] = float(data['budget'])
+        data['locations_budget'] = float(data['locations_budget'])
+        return data
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Any
+from datetime import datetime
+from uuid import UUID
+
+
+class ChangeEntry(BaseModel):
+    entity_type: str = Field(..., description="Тип сутності: travel_plan або location")
+    operation: str = Field(..., description="Тип зміни: upsert або delete")
+    entity_id: UUID
+    travel_plan_id: UUID
+    changed_at: datetime
+    data: Optional[dict[str, Any]] = Field(None, description="Поточний стан сутності (відсутній для delete)")
+    token: str = Field(..., description="Позиція цього запису в журналі (токен для ?since= / Last-Event-ID)")
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: list[ChangeEntry] = Field(default_factory=list)
+    next_token: str = Field(..., description="Токен для наступного запиту ?since=")
+    has_more: bool = Field(False, description="Чи є ще зміни після next_token")
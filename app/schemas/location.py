@@ -58,6 +58,7 @@ class LocationResponse(LocationBase):
     id: UUID
     travel_plan_id: UUID
     created_at: datetime
+    updated_at: datetime
 
     @model_serializer
     def ser_model(self):
@@ -71,3 +72,18 @@ class LocationResponse(LocationBase):
     class Config:
         from_attributes = True
 
+
+
+class LocationConflict(BaseModel):
+    location_id: UUID
+    location_name: str
+    other_location_id: UUID
+    other_location_name: str
+    overlap_start: datetime
+    overlap_end: datetime
+
+
+class ScheduleConflictReport(BaseModel):
+    travel_plan_id: UUID
+    checked_locations: int = Field(..., description="Кількість локацій з обома датами")
+    conflicts: list[LocationConflict] = Field(default_factory=list)
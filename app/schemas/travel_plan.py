@@ -103,6 +103,19 @@ class TravelPlanUpdate(BaseModel):
         return v
 
 
+class TravelPlanClone(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=200, description="Назва копії (за замовчуванням - як в оригіналу)")
+    shift_days: int = Field(0, ge=-36500, le=36500, description="Зсув усіх дат плану та локацій у днях")
+    is_public: Optional[bool] = Field(None, description="Публічність копії (за замовчуванням - як в оригіналу)")
+
+    @field_validator('title')
+    @classmethod
+    def validate_title(cls, v):
+        if v is not None and not v.strip():
+            raise ValueError('title cannot be empty or whitespace only')
+        return v.strip() if v else v
+
+
 class TravelPlanResponse(TravelPlanBase):
     id: UUID
     version: int
@@ -0,0 +1,374 @@
+"""
+Генератор синтетичних даних для тестів масштабування.
+
+Плани та локації генеруються потоково і завантажуються через PostgreSQL COPY
+кількома паралельними процесами. Всі значення задовольняють CheckConstraint
+моделей TravelPlan та Location.
+
+У шардованому режимі (SHARD_DATABASE_URLS) чанк i завантажується в шард
+i % кількість шардів, а ID його планів та локацій зсуваються в простір цього
+шарду (як app.sharding.id_on_shard), тож API знаходить їх без пошуку.
+
+Приклад:
+    python -m app.seed_data --plans 1000000 --locations-mean 10 --workers 8
+"""
+import argparse
+import math
+import random
+import secrets
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from multiprocessing import Pool
+from pathlib import Path
+
+# Додаємо кореневу директорію проекту до Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.database import data_engines
+
+
+CURRENCIES = ["USD", "EUR", "UAH", "GBP", "PLN", "JPY"]
+TITLES = [
+    "Summer Vacation in Europe", "Winter Ski Trip", "Beach Holiday", "City Break",
+    "Adventure Travel", "Cultural Tour", "Road Trip", "Mountain Hiking",
+]
+DESCRIPTIONS = [
+    "An amazing journey through beautiful places",
+    "Exploring new cultures and traditions",
+    "Relaxing and enjoying nature",
+    "Discovering hidden gems",
+    None,
+]
+# (назва, широта, довгота) - локації розкидаються навколо цих міст
+CITIES = [
+    ("Paris", 48.8566, 2.3522), ("London", 51.5074, -0.1278), ("Rome", 41.9028, 12.4964),
+    ("Barcelona", 41.3874, 2.1686), ("Amsterdam", 52.3676, 4.9041), ("Berlin", 52.5200, 13.4050),
+    ("Prague", 50.0755, 14.4378), ("Vienna", 48.2082, 16.3738), ("Kyiv", 50.4501, 30.5234),
+    ("Lviv", 49.8397, 24.0297), ("Tokyo", 35.6762, 139.6503), ("New York", 40.7128, -74.0060),
+]
+
+PLAN_COLUMNS = (
+    "id", "title", "description", "start_date", "end_date", "budget",
+    "currency", "is_public", "created_at", "updated_at",
+)
+LOCATION_COLUMNS = (
+    "id", "travel_plan_id", "name", "address", "latitude", "longitude", "visit_order",
+    "arrival_date", "departure_date", "budget", "notes", "created_at", "updated_at",
+)
+
+NULL = "\\N"
+COPY_BUFFER_SIZE = 1 << 16
+ID_SPACE = 2 ** 32
+
+
+def place_on_shard(value: uuid.UUID, shard: int, shards: int) -> uuid.UUID:
+    """
+    UUID з тими ж випадковими бітами, перші 4 байти якого за модулем shards
+    дають shard (див. app.sharding.shard_index)
+    """
+    if shards <= 1:
+        return value
+    prefix = int.from_bytes(value.bytes[:4], "big")
+    prefix += shard - prefix % shards
+    if prefix >= ID_SPACE:
+        prefix -= shards
+    return uuid.UUID(bytes=prefix.to_bytes(4, "big") + value.bytes[4:])
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = str(value)
+    return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy_row(values) -> str:
+    return "\t".join(_copy_value(v) for v in values) + "\n"
+
+
+class GeneratorReader:
+    """
+    File-like обгортка над генератором рядків для cursor.copy_expert
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._buffer = ""
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            size = len(self._buffer)
+        chunk, self._buffer = self._buffer[:size], self._buffer[size:]
+        return chunk
+
+    def readline(self, size: int = -1) -> str:
+        if self._buffer:
+            line, self._buffer = self._buffer, ""
+            return line
+        return next(self._lines, "")
+
+
+def locations_count(rng: random.Random, distribution: str, mean: float, maximum: int) -> int:
+    """
+    Кількість локацій у плані за обраним розподілом
+    """
+    if distribution == "fixed":
+        count = round(mean)
+    elif distribution == "uniform":
+        count = rng.randint(0, max(0, round(2 * mean)))
+    elif distribution == "exponential":
+        # Довгий хвіст: більшість планів невеликі, окремі - дуже великі
+        count = int(rng.expovariate(1.0 / mean)) if mean > 0 else 0
+    elif distribution == "poisson":
+        # Алгоритм Кнута; для великих середніх - нормальне наближення
+        if mean > 30:
+            count = max(0, round(rng.gauss(mean, math.sqrt(mean))))
+        else:
+            threshold, count, p = math.exp(-mean), 0, 1.0
+            while True:
+                p *= rng.random()
+                if p <= threshold:
+                    break
+                count += 1
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return min(count, maximum)
+
+
+def generate_plan(rng: random.Random, public_ratio: float, now: datetime, id_salt: int,
+                  shard: int = 0, shards: int = 1):
+    """
+    Повертає рядок travel_plans та межі дат для локацій
+    """
+    plan_id = place_on_shard(uuid.UUID(int=rng.getrandbits(128) ^ id_salt, version=4), shard, shards)
+    created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+    updated_at = created_at + timedelta(seconds=rng.randint(0, 30 * 24 * 3600))
+    if updated_at > now:
+        updated_at = now
+
+    start_date = end_date = None
+    if rng.random() < 0.9:
+        start_date = date.today() + timedelta(days=rng.randint(-180, 540))
+        end_date = start_date + timedelta(days=rng.randint(0, 30))
+
+    budget = None
+    if rng.random() < 0.8:
+        budget = f"{rng.randint(100, 50000)}.{rng.randint(0, 99):02d}"
+
+    row = (
+        plan_id,
+        f"{rng.choice(TITLES)} {rng.randint(1, 999999)}",
+        rng.choice(DESCRIPTIONS),
+        start_date,
+        end_date,
+        budget,
+        rng.choice(CURRENCIES),
+        rng.random() < public_ratio,
+        created_at.isoformat(),
+        updated_at.isoformat(),
+    )
+    return row, start_date, end_date, created_at
+
+
+def generate_locations(rng: random.Random, plan_id, count: int, start_date, end_date, created_at, id_salt: int,
+                       shard: int = 0, shards: int = 1):
+    """
+    Генерує локації плану з послідовними visit_order та неперекривними візитами
+    """
+    if start_date is not None:
+        span_start = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+        span_seconds = ((end_date - start_date).days + 1) * 24 * 3600
+    else:
+        span_start, span_seconds = None, 0
+    slot = span_seconds // count if count else 0
+
+    for order in range(1, count + 1):
+        name, city_lat, city_lon = rng.choice(CITIES)
+        latitude = max(-90.0, min(90.0, city_lat + rng.uniform(-0.2, 0.2)))
+        longitude = max(-180.0, min(180.0, city_lon + rng.uniform(-0.2, 0.2)))
+
+        arrival = departure = None
+        if span_start is not None and slot > 0 and rng.random() < 0.85:
+            arrival = span_start + timedelta(seconds=(order - 1) * slot + rng.randint(0, slot // 4))
+            departure = arrival + timedelta(seconds=rng.randint(0, slot // 2))
+
+        budget = None
+        if rng.random() < 0.6:
+            budget = f"{rng.randint(0, 2000)}.{rng.randint(0, 99):02d}"
+
+        loc_created = created_at + timedelta(seconds=order)
+        yield (
+            place_on_shard(uuid.UUID(int=rng.getrandbits(128) ^ id_salt, version=4), shard, shards),
+            plan_id,
+            f"{name} #{order}",
+            f"{rng.randint(1, 300)} Main Street, {name}" if rng.random() < 0.7 else None,
+            f"{latitude:.6f}",
+            f"{longitude:.6f}",
+            order,
+            arrival.isoformat() if arrival else None,
+            departure.isoformat() if departure else None,
+            budget,
+            None,
+            loc_created.isoformat(),
+            loc_created.isoformat(),
+        )
+
+
+def chunk_shard(args, chunk_index: int) -> int:
+    return chunk_index % args.shards
+
+
+def generate_plan_lines(args, chunk_index: int, plans_in_chunk: int, plan_meta: list):
+    """
+    Потоково генерує рядки COPY для планів чанку; в plan_meta складає
+    короткі дані (id, дати, кількість локацій), потрібні для генерації локацій
+    """
+    rng = random.Random(args.seed * 1_000_003 + chunk_index)
+    now = datetime.now(timezone.utc)
+    for _ in range(plans_in_chunk):
+        plan_row, start_date, end_date, created_at = generate_plan(
+            rng, args.public_ratio, now, args.id_salt, chunk_shard(args, chunk_index), args.shards
+        )
+        count = locations_count(rng, args.distribution, args.locations_mean, args.locations_max)
+        plan_meta.append((plan_row[0], count, start_date, end_date, created_at))
+        yield _copy_row(plan_row)
+
+
+def generate_location_lines(args, chunk_index: int, plan_meta: list, counter: list):
+    """
+    Потоково генерує рядки COPY для локацій планів чанку
+    """
+    rng = random.Random(args.seed * 1_000_003 + chunk_index + 7_919)
+    for plan_id, count, start_date, end_date, created_at in plan_meta:
+        locations = generate_locations(
+            rng, plan_id, count, start_date, end_date, created_at, args.id_salt,
+            chunk_shard(args, chunk_index), args.shards
+        )
+        for location_row in locations:
+            counter[0] += 1
+            yield _copy_row(location_row)
+
+
+def _connect(target, disable_triggers: bool):
+    cargs, cparams = target.dialect.create_connect_args(target.url)
+    conn = target.dialect.connect(*cargs, **cparams)
+    if disable_triggers:
+        # Вимикає для цієї сесії всі тригери, включно з перевіркою FK (RI-тригери);
+        # потребує superuser. Згенеровані дані FK не порушують: плани завантажуються
+        # в тій же транзакції перед своїми локаціями
+        with conn.cursor() as cursor:
+            cursor.execute("SET session_replication_role = replica")
+    return conn
+
+
+def _load_chunks(job):
+    """
+    Воркер: власне з'єднання з кожним потрібним шардом, COPY чанків планів,
+    потім їхніх локацій, коміт на чанк
+    """
+    args, chunk_indexes = job
+    targets = data_engines()
+    connections = {}
+    plans_total = locations_total = 0
+    try:
+        for chunk_index in chunk_indexes:
+            shard = chunk_shard(args, chunk_index)
+            if shard not in connections:
+                connections[shard] = _connect(targets[shard], args.disable_triggers)
+            conn = connections[shard]
+            with conn.cursor() as cursor:
+                plans_in_chunk = min(args.chunk_size, args.plans - chunk_index * args.chunk_size)
+                plan_meta, location_counter = [], [0]
+                # Спочатку плани (FK), потім їхні локації - обидва COPY в одній транзакції
+                cursor.copy_expert(
+                    f"COPY travel_plans ({', '.join(PLAN_COLUMNS)}) FROM STDIN",
+                    GeneratorReader(generate_plan_lines(args, chunk_index, plans_in_chunk, plan_meta)),
+                    size=COPY_BUFFER_SIZE
+                )
+                cursor.copy_expert(
+                    f"COPY locations ({', '.join(LOCATION_COLUMNS)}) FROM STDIN",
+                    GeneratorReader(generate_location_lines(args, chunk_index, plan_meta, location_counter)),
+                    size=COPY_BUFFER_SIZE
+                )
+            conn.commit()
+            plans_total += len(plan_meta)
+            locations_total += location_counter[0]
+    finally:
+        for conn in connections.values():
+            conn.close()
+    return plans_total, locations_total
+
+
+def seed(args):
+    chunks = math.ceil(args.plans / args.chunk_size)
+    # Чанки розподіляються між воркерами по колу
+    jobs = [(args, list(range(w, chunks, args.workers))) for w in range(min(args.workers, chunks))]
+
+    print(f"Генерація {args.plans} планів ({chunks} чанків, {len(jobs)} воркерів, {args.shards} шардів, "
+          f"--seed {args.seed} --id-salt {args.id_salt})...")
+    started = time.perf_counter()
+    plans_total = locations_total = 0
+    with Pool(processes=len(jobs)) as pool:
+        for plans, locations in pool.imap_unordered(_load_chunks, jobs):
+            plans_total += plans
+            locations_total += locations
+            print(f"[OK] Воркер завершив: {plans} планів, {locations} локацій")
+
+    for target in data_engines():
+        with target.connect() as conn:
+            conn.exec_driver_sql("ANALYZE travel_plans")
+            conn.exec_driver_sql("ANALYZE locations")
+
+    elapsed = time.perf_counter() - started
+    print(f"[OK] Завантажено {plans_total} планів та {locations_total} локацій за {elapsed:.1f} с "
+          f"({(plans_total + locations_total) / max(elapsed, 1e-9):.0f} рядків/с)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Генерація синтетичних планів та локацій через COPY")
+    parser.add_argument("--plans", type=int, default=100_000, help="Кількість планів")
+    parser.add_argument("--locations-mean", type=float, default=10.0, help="Середня кількість локацій у плані")
+    parser.add_argument("--locations-max", type=int, default=1000, help="Максимальна кількість локацій у плані")
+    parser.add_argument(
+        "--distribution", choices=["fixed", "uniform", "poisson", "exponential"], default="poisson",
+        help="Розподіл кількості локацій у плані"
+    )
+    parser.add_argument("--public-ratio", type=float, default=0.3, help="Частка публічних планів")
+    parser.add_argument("--workers", type=int, default=4, help="Кількість паралельних процесів")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Планів в одній транзакції")
+    parser.add_argument("--seed", type=int, default=42, help="Seed для відтворюваних даних (крім ID)")
+    parser.add_argument(
+        "--id-salt", type=int, default=None,
+        help="Домішується до UUID планів та локацій; за замовчуванням випадковий на кожен запуск, "
+             "тому повторний запуск доповнює існуючий набір без конфліктів ключів. "
+             "Для повністю відтворюваних ID вкажіть однакове значення (напр. 0)"
+    )
+    parser.add_argument(
+        "--disable-triggers", action="store_true",
+        help="Не запускати тригери під час завантаження (session_replication_role=replica, потребує superuser). "
+             "Вимикає всі тригери сесії, включно з перевіркою FOREIGN KEY, а не лише change_log: "
+             "завантажені рядки не потраплять у change feed"
+    )
+    args = parser.parse_args(argv)
+    if args.id_salt is None:
+        args.id_salt = secrets.randbits(128)
+    args.shards = len(data_engines())
+    if args.plans <= 0 or args.workers <= 0 or args.chunk_size <= 0:
+        parser.error("--plans, --workers та --chunk-size повинні бути > 0")
+    if not 0 <= args.public_ratio <= 1:
+        parser.error("--public-ratio повинен бути в межах [0, 1]")
+    return args
+
+
+if __name__ == "__main__":
+    seed(parse_args())
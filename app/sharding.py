@@ -0,0 +1,159 @@
+"""
+Шардований режим (SHARD_DATABASE_URLS): плани та їх локації живуть в одній
+з кількох БД, шард визначається детерміновано з UUID плану.
+
+Шард UUID - перші 4 байти як число за модулем кількості шардів. Для планів
+з випадковим uuid4 це рівномірний розподіл. ID локацій та планів-копій
+генеруються так, щоб вони потрапляли в шард свого плану: тоді запит
+до /locations/{id} маршрутизується за самим id без пошуку по шардах.
+
+Списки без фільтра за планом опитують усі шарди одночасно і зливають
+впорядковані сторінки (кожен шард повертає skip + limit рядків по індексу
+порядку, skip обмежений SHARD_MAX_SKIP).
+"""
+import asyncio
+import heapq
+import secrets
+import uuid
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Iterable, Optional
+from uuid import UUID
+
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SHARDING_ENABLED, SessionLocal, shard_sessions
+
+ID_SPACE = 2 ** 32
+
+
+def shard_count() -> int:
+    return len(shard_sessions)
+
+
+def shard_index(entity_id: UUID) -> int:
+    return int.from_bytes(entity_id.bytes[:4], "big") % shard_count()
+
+
+def id_on_shard(shard: int) -> UUID:
+    """
+    Випадковий UUID, що належить шарду shard
+    """
+    count = shard_count()
+    prefix = secrets.randbelow(ID_SPACE // count) * count + shard
+    return UUID(bytes=prefix.to_bytes(4, "big") + uuid.uuid4().bytes[4:])
+
+
+def _open(shard: int) -> Session:
+    db = shard_sessions[shard]()
+    db.info["shard"] = shard
+    return db
+
+
+def session_for_plan(plan_id: UUID) -> Session:
+    if not SHARDING_ENABLED:
+        return SessionLocal()
+    return _open(shard_index(plan_id))
+
+
+def session_for_location(location_id: UUID) -> Session:
+    if not SHARDING_ENABLED:
+        return SessionLocal()
+    return _open(shard_index(location_id))
+
+
+def session_for_request(request) -> Session:
+    """
+    Шард за travel_plan_id / location_id зі шляху або query; інакше випадковий шард
+    (нові плани розподіляються між шардами)
+    """
+    params = request.path_params
+    for name, resolve in (("travel_plan_id", session_for_plan), ("location_id", session_for_location)):
+        value = params.get(name) or request.query_params.get(name)
+        if value:
+            try:
+                return resolve(value if isinstance(value, UUID) else UUID(str(value)))
+            except ValueError:
+                # Некоректний UUID відхилить валідація параметрів маршруту
+                break
+    return _open(secrets.randbelow(shard_count()))
+
+
+@contextmanager
+def plan_session(plan_id: Optional[UUID], db: Session):
+    """
+    Сесія шарду плану, відомого лише з тіла запиту; db, якщо вона вже на цьому шарді
+    """
+    if not SHARDING_ENABLED or plan_id is None or db.info.get("shard") == shard_index(plan_id):
+        yield db
+        return
+    plan_db = _open(shard_index(plan_id))
+    try:
+        yield plan_db
+    finally:
+        plan_db.close()
+
+
+def new_id(db: Session) -> UUID:
+    """
+    ID нового плану/локації, що належить шарду сесії
+    """
+    shard = db.info.get("shard")
+    if shard is None:
+        return uuid.uuid4()
+    return id_on_shard(shard)
+
+
+def new_id_sql(db: Session):
+    """
+    SQL-вираз для ID рядків, що створюються всередині PostgreSQL (INSERT ... SELECT)
+    """
+    shard = db.info.get("shard")
+    if shard is None:
+        return literal_column("gen_random_uuid()", PG_UUID(as_uuid=True))
+    count = shard_count()
+    return literal_column(
+        f"CAST(lpad(to_hex(floor(random() * {ID_SPACE // count})::bigint * {count} + {shard}), 8, '0')"
+        f" || substr(gen_random_uuid()::text, 9) AS uuid)",
+        PG_UUID(as_uuid=True)
+    )
+
+
+async def fan_out(fn: Callable[[Session], Any]) -> list:
+    """
+    Виконує fn(session) на всіх шардах одночасно (кожен у threadpool)
+    """
+    def run(shard: int):
+        db = _open(shard)
+        try:
+            return fn(db)
+        finally:
+            db.close()
+
+    return await asyncio.gather(*(run_in_threadpool(run, shard) for shard in range(shard_count())))
+
+
+def skip_too_large(skip: int) -> Optional[JSONResponse]:
+    """
+    400, якщо skip перевищує SHARD_MAX_SKIP: кожен шард читає skip + limit рядків,
+    тож глибокі сторінки коштують пропорційно skip на кожному шарді
+    """
+    if skip <= settings.SHARD_MAX_SKIP:
+        return None
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"error": f"skip must not exceed {settings.SHARD_MAX_SKIP} in sharded mode"}
+    )
+
+
+def merge_pages(pages: Iterable[list], key: Callable, skip: int, limit: int) -> list:
+    """
+    Зливає впорядковані сторінки шардів і вирізає [skip, skip + limit)
+    """
+    return list(islice(heapq.merge(*pages, key=key), skip, skip + limit))
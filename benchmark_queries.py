@@ -0,0 +1,123 @@
+"""
+Бенчмарк Python-накладних витрат гарячих запитів: ORM-запит, що будується
+на кожен виклик (як було в роутерах), проти statements з app.queries.
+
+Накладні витрати = загальний час мінус час усередині cursor.execute
+(мережа + PostgreSQL), тобто побудова запиту, cache key, компіляція
+та обробка результату на стороні Python.
+
+Потрібна ініціалізована БД (DATABASE_URL). Тестові дані створюються
+в транзакції, яка в кінці відкочується.
+
+    python benchmark_queries.py --iterations 5000
+"""
+import argparse
+import time
+
+from sqlalchemy import event, func
+
+from app import queries
+from app.database import engine, SessionLocal
+from app.models import TravelPlan, Location
+
+
+class CursorTimer:
+    """
+    Сумарний час у cursor.execute
+    """
+
+    def __init__(self):
+        self.total = 0.0
+        self._started = 0.0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        self._started = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += time.perf_counter() - self._started
+
+
+def legacy_cases(db, plan_id, location_id):
+    return {
+        "get_travel_plan": lambda: db.query(TravelPlan).filter(TravelPlan.id == plan_id).first(),
+        "travel_plan_exists": lambda: db.query(TravelPlan.id).filter(TravelPlan.id == plan_id).first(),
+        "get_location": lambda: db.query(Location).filter(Location.id == location_id).first(),
+        "list_plan_locations": lambda: db.query(Location).filter(
+            Location.travel_plan_id == plan_id
+        ).order_by(Location.visit_order).offset(0).limit(100).all(),
+        "next_visit_order": lambda: (db.query(func.max(Location.visit_order)).filter(
+            Location.travel_plan_id == plan_id
+        ).scalar() or 0) + 1,
+    }
+
+
+def cached_cases(db, plan_id, location_id):
+    return {
+        "get_travel_plan": lambda: queries.get_travel_plan(db, plan_id),
+        "travel_plan_exists": lambda: queries.travel_plan_exists(db, plan_id),
+        "get_location": lambda: queries.get_location(db, location_id),
+        "list_plan_locations": lambda: queries.list_plan_locations(db, plan_id, 0, 100),
+        "next_visit_order": lambda: queries.next_visit_order(db, plan_id),
+    }
+
+
+def measure(db, fn, iterations: int, timer: CursorTimer) -> float:
+    """
+    Повертає Python-накладні витрати на виклик у мікросекундах
+    """
+    for _ in range(min(iterations, 200)):
+        fn()
+        db.expunge_all()
+
+    timer.total = 0.0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+        # Як у новому запиті: об'єкти не беруться з identity map попередньої ітерації
+        db.expunge_all()
+    elapsed = time.perf_counter() - started
+    return (elapsed - timer.total) / iterations * 1e6
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Бенчмарк накладних витрат гарячих запитів")
+    parser.add_argument("--iterations", type=int, default=5000, help="Кількість викликів на запит")
+    parser.add_argument("--locations", type=int, default=10, help="Кількість локацій у тестовому плані")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # SQL echo спотворив би результат
+    engine.echo = False
+    timer = CursorTimer()
+
+    db = SessionLocal()
+    try:
+        plan = TravelPlan(title="Benchmark plan")
+        db.add(plan)
+        db.flush()
+        for order in range(1, args.locations + 1):
+            db.add(Location(travel_plan_id=plan.id, name=f"Location {order}", visit_order=order))
+        db.flush()
+        plan_id = plan.id
+        location_id = db.query(Location.id).filter(Location.travel_plan_id == plan_id).first()[0]
+        db.expunge_all()
+
+        legacy = legacy_cases(db, plan_id, location_id)
+        cached = cached_cases(db, plan_id, location_id)
+
+        print(f"{'query':<22}{'legacy, us':>12}{'cached, us':>12}{'speedup':>10}")
+        for name in legacy:
+            before = measure(db, legacy[name], args.iterations, timer)
+            after = measure(db, cached[name], args.iterations, timer)
+            print(f"{name:<22}{before:>12.1f}{after:>12.1f}{before / after:>9.2f}x")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+-- Change feed: updated_at для locations
+ALTER TABLE locations ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW();
+
+CREATE INDEX IF NOT EXISTS idx_locations_updated_at ON locations(updated_at);
+CREATE INDEX IF NOT EXISTS idx_travel_plans_updated_at ON travel_plans(updated_at);
+
+-- Журнал змін (включно з tombstones для видалених рядків)
+CREATE TABLE IF NOT EXISTS change_log (
+    id BIGSERIAL PRIMARY KEY,
+    txid BIGINT NOT NULL DEFAULT (pg_current_xact_id()::text)::bigint,
+    entity_type VARCHAR(20) NOT NULL CHECK (entity_type IN ('travel_plan', 'location')),
+    entity_id UUID NOT NULL,
+    travel_plan_id UUID NOT NULL,
+    operation VARCHAR(10) NOT NULL CHECK (operation IN ('upsert', 'delete')),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_txid_id ON change_log(txid, id);
+
+-- Тригер для оновлення updated_at у locations
+CREATE OR REPLACE FUNCTION update_location_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_locations_modtime ON locations;
+CREATE TRIGGER update_locations_modtime
+BEFORE UPDATE ON locations
+FOR EACH ROW
+EXECUTE FUNCTION update_location_updated_at_column();
+
+-- Тригер для запису змін у change_log та NOTIFY
+CREATE OR REPLACE FUNCTION record_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    rec RECORD;
+    plan_id UUID;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        rec := OLD;
+    ELSE
+        rec := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'travel_plans' THEN
+        plan_id := rec.id;
+    ELSE
+        plan_id := rec.travel_plan_id;
+    END IF;
+
+    INSERT INTO change_log (entity_type, entity_id, travel_plan_id, operation)
+    VALUES (
+        TG_ARGV[0], rec.id, plan_id,
+        CASE WHEN TG_OP = 'DELETE' THEN 'delete' ELSE 'upsert' END
+    );
+    PERFORM pg_notify('travel_changes', TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS record_travel_plans_change ON travel_plans;
+CREATE TRIGGER record_travel_plans_change
+AFTER INSERT OR UPDATE OR DELETE ON travel_plans
+FOR EACH ROW
+EXECUTE FUNCTION record_change('travel_plan');
+
+DROP TRIGGER IF EXISTS record_locations_change ON locations;
+CREATE TRIGGER record_locations_change
+AFTER INSERT OR UPDATE OR DELETE ON locations
+FOR EACH ROW
+EXECUTE FUNCTION record_change('location');
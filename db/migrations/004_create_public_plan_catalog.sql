@@ -0,0 +1,25 @@
+-- Каталог публічних планів (materialized view, оновлюється CONCURRENTLY)
+CREATE MATERIALIZED VIEW IF NOT EXISTS public_plan_catalog AS
+SELECT
+    p.id,
+    p.title,
+    p.description,
+    p.start_date,
+    p.end_date,
+    p.budget,
+    p.currency,
+    p.created_at,
+    p.updated_at,
+    COUNT(l.id) AS location_count,
+    COALESCE(SUM(l.budget), 0) AS locations_budget,
+    MIN(l.arrival_date) AS first_arrival,
+    MAX(l.departure_date) AS last_departure
+FROM travel_plans p
+LEFT JOIN locations l ON l.travel_plan_id = p.id
+WHERE p.is_public
+GROUP BY p.id;
+
+-- Унікальний індекс обов'язковий для REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_public_plan_catalog_id ON public_plan_catalog(id);
+CREATE INDEX IF NOT EXISTS idx_public_plan_catalog_recent ON public_plan_catalog(updated_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_public_plan_catalog_popular ON public_plan_catalog(location_count DESC, updated_at DESC, id);
@@ -0,0 +1,7 @@
+-- Межа очищення change_log: позиція (txid, id) останнього видаленого запису.
+-- Токени change feed, старші за неї, отримують 410 Gone (потрібна повна ресинхронізація)
+CREATE TABLE IF NOT EXISTS change_log_horizon (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    txid BIGINT NOT NULL,
+    change_id BIGINT NOT NULL
+);
@@ -0,0 +1,4 @@
+-- Порядок сторінок списків у шардованому режимі:
+-- ORDER BY created_at, id (плани) та ORDER BY visit_order, id (локації) з LIMIT skip + limit
+CREATE INDEX IF NOT EXISTS idx_travel_plans_created_at_id ON travel_plans(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_locations_visit_order_id ON locations(visit_order, id);
@@ -1,6 +1,14 @@
 -- Створення publication для логічної реплікації
 DROP PUBLICATION IF EXISTS travel_planner_pub;
-CREATE PUBLICATION travel_planner_pub FOR ALL TABLES;
+-- Явний список таблиць, а не FOR ALL TABLES: службові таблиці, що є лише на publisher
+-- (alembic_version, тимчасові таблиці онлайн-міграції locations), не публікуються -
+-- на репліках їх немає, і apply worker зупинився б з "relation does not exist".
+-- Нова таблиця даних додається і сюди, і в db/migrations/*.sql (з яких будується схема реплік).
+-- publish_via_partition_root: якщо locations партиціоновано, репліки отримують зміни як для locations
+CREATE PUBLICATION travel_planner_pub
+    FOR TABLE travel_plans, locations, change_log, change_log_horizon
+    WITH (publish_via_partition_root = true);
 
 -- Перевірка publication
 SELECT * FROM pg_publication WHERE pubname = 'travel_planner_pub';
+SELECT * FROM pg_publication_tables WHERE pubname = 'travel_planner_pub';
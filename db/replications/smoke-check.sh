@@ -0,0 +1,57 @@
+#!/bin/bash
+# Smoke-перевірка логічної реплікації в docker-compose топології:
+#   - publication містить лише таблиці даних (без alembic_version);
+#   - на publisher є alembic_version (контейнер app уже застосував/позначив ревізію);
+#   - тестовий план, вставлений на publisher, з'являється на обох репліках;
+#   - apply worker реплік не має помилок.
+#
+#   ./db/replications/smoke-check.sh [timeout_seconds]
+set -euo pipefail
+
+TIMEOUT="${1:-30}"
+DB_USER="${DB_USER:-travel}"
+DB_NAME="${DB_NAME:-travel_db}"
+REPLICAS=(postgres_sub postgres_sub2)
+
+psql_on() {
+    local service="$1"
+    shift
+    docker compose exec -T "$service" psql -v ON_ERROR_STOP=1 -U "$DB_USER" -d "$DB_NAME" -tAc "$@"
+}
+
+fail() {
+    echo "[ERROR] $1"
+    exit 1
+}
+
+published=$(psql_on postgres "SELECT string_agg(tablename, ',' ORDER BY tablename) FROM pg_publication_tables WHERE pubname = 'travel_planner_pub'")
+echo "Publication tables: $published"
+case ",$published," in
+    *,alembic_version,*) fail "alembic_version is published - subscribers do not have it" ;;
+esac
+[ "$(psql_on postgres "SELECT puballtables FROM pg_publication WHERE pubname = 'travel_planner_pub'")" = "f" ] \
+    || fail "travel_planner_pub is FOR ALL TABLES - recreate it from db/replications/publisher/100_create_publication.sql"
+
+revision=$(psql_on postgres "SELECT version_num FROM alembic_version" 2>/dev/null || true)
+echo "Publisher alembic revision: ${revision:-<none>}"
+
+marker="replication-smoke-$(date +%s)-$$"
+plan_id=$(psql_on postgres "INSERT INTO travel_plans (title) VALUES ('$marker') RETURNING id" | head -n 1)
+cleanup() {
+    psql_on postgres "DELETE FROM travel_plans WHERE id = '$plan_id'" > /dev/null || true
+}
+trap cleanup EXIT
+echo "Inserted plan $plan_id on publisher"
+
+for replica in "${REPLICAS[@]}"; do
+    deadline=$((SECONDS + TIMEOUT))
+    until [ "$(psql_on "$replica" "SELECT count(*) FROM travel_plans WHERE id = '$plan_id'")" = "1" ]; do
+        [ $SECONDS -lt $deadline ] || fail "$replica: plan not replicated within ${TIMEOUT}s"
+        sleep 1
+    done
+    errors=$(psql_on "$replica" "SELECT coalesce(sum(apply_error_count + sync_error_count), 0) FROM pg_stat_subscription_stats")
+    [ "$errors" = "0" ] || fail "$replica: subscription has $errors apply/sync errors (see replica logs)"
+    echo "[OK] $replica: plan replicated, no apply errors"
+done
+
+echo "[OK] Logical replication works"
@@ -9,9 +9,22 @@ done
 
 echo "PostgreSQL is ready!"
 
-# Ініціалізуємо базу даних, якщо потрібно
-echo "Initializing database..."
-python -m app.db_init || echo "Database already initialized or initialization failed"
+# Швидкий шлях: ревізія в БД збігається з head образу - без Python-процесу та DDL
+SCHEMA_HEAD=$(cat /app/.schema_head 2>/dev/null || true)
+SCHEMA_CURRENT=$(psql "$DATABASE_URL" -tAc "SELECT version_num FROM alembic_version" 2>/dev/null || true)
+
+case "${STRICT_SCHEDULE:-false}" in
+  [Tt]rue|1|[Yy]es|[Oo]n) STRICT=1 ;;
+  *) STRICT=0 ;;
+esac
+
+# У шардованому режимі кожен шард перевіряє python -m app.migrations
+if [ -z "${SHARD_DATABASE_URLS:-}" ] && [ -n "$SCHEMA_HEAD" ] && [ "$SCHEMA_CURRENT" = "$SCHEMA_HEAD" ] && [ "$STRICT" = "0" ]; then
+  echo "Database schema is up to date ($SCHEMA_CURRENT), skipping migrations"
+else
+  echo "Checking database schema..."
+  python -m app.migrations || echo "Database schema check failed"
+fi
 
 echo "Starting application..."
 exec "$@"
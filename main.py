@@ -1,12 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from app.routers import travel_plans, locations
+from sqlalchemy.exc import IntegrityError
+from app.routers import travel_plans, locations, changes, catalog
 from app.config import settings
+from app.admission import AdmissionControlMiddleware, admission_stats
+from app.catalog import catalog_snapshot
+from app.change_feed import change_log_pruner
+from app.health import db_health
+from app.logging_setup import setup_logging, shutdown_logging, AccessLogMiddleware
 # Імпортуємо schemas, щоб forward references вирішились
 from app.schemas import travel_plan, location
 
+# JSON-логи через чергу та фоновий потік
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Фонова перевірка БД для /ready, оновлення каталогу публічних планів та очищення change_log
+    db_health.start()
+    catalog_snapshot.start()
+    change_log_pruner.start()
+    yield
+    await change_log_pruner.stop()
+    await catalog_snapshot.stop()
+    await db_health.stop()
+    shutdown_logging()
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description="API для управління планами подорожей та локаціями",
@@ -14,6 +39,16 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+if settings.ADMISSION_ENABLED:
+    # /health, /ready та довгоживучі SSE-потоки не займають слотів
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        exempt_paths=("/health", "/ready", "/api/changes/stream")
+    )
+
+# Додається останнім - зовнішній шар, тому логує і відхилені admission control запити
+app.add_middleware(AccessLogMiddleware)
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -23,9 +58,21 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         content={"error": "Validation error", "detail": str(exc)}
     )
 
+@app.exception_handler(IntegrityError)
+async def integrity_exception_handler(request: Request, exc: IntegrityError):
+    """Порушення exclusion constraint розкладу (strict-режим) -> 409"""
+    if getattr(exc.orig, "pgcode", None) == "23P01":
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"error": "Conflict: location visit overlaps another visit in this travel plan"}
+        )
+    raise exc
+
 # Підключення роутерів (формат згідно з тестами)
 app.include_router(travel_plans.router, prefix="/api/travel-plans", tags=["travel-plans"])
 app.include_router(locations.router, prefix="/api/locations", tags=["locations"])
+app.include_router(changes.router, prefix="/api/changes", tags=["changes"])
+app.include_router(catalog.router, prefix="/api/catalog", tags=["catalog"])
 
 
 @app.get("/")
@@ -39,5 +86,15 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "admission": admission_stats()}
+
 
+@app.get("/ready")
+async def readiness_check():
+    """Закешований результат фонової перевірки БД, без запиту до БД"""
+    if not db_health.is_ready():
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"error": "Database unavailable", "database": db_health.snapshot()}
+        )
+    return {"status": "ready", "database": db_health.snapshot()}
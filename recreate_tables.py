@@ -9,8 +9,11 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from app.config import settings
 from app.database import engine, Base
-from app.models import TravelPlan, Location
+from app.models import TravelPlan, Location, ChangeLog, ChangeLogHorizon
+from app.db_init import create_change_feed_sql, create_catalog_sql
+from app.partitioning import create_partitioned_locations
 from sqlalchemy import text
 
 
@@ -34,14 +37,25 @@ def recreate_tables():
             print("Видалення старих таблиць...")
             conn.execute(text("DROP TABLE IF EXISTS locations CASCADE;"))
             conn.execute(text("DROP TABLE IF EXISTS travel_plans CASCADE;"))
+            conn.execute(text("DROP TABLE IF EXISTS change_log CASCADE;"))
+            # Межа очищення старого журналу інакше відхиляла б токени нового
+            conn.execute(text("DROP TABLE IF EXISTS change_log_horizon CASCADE;"))
             conn.execute(text("DROP FUNCTION IF EXISTS update_updated_at_column() CASCADE;"))
+            conn.execute(text("DROP FUNCTION IF EXISTS update_location_updated_at_column() CASCADE;"))
+            conn.execute(text("DROP FUNCTION IF EXISTS record_change() CASCADE;"))
             conn.commit()
             print("[OK] Старі таблиці видалено")
         
         # Створюємо таблиці заново
         print("Створення нових таблиць...")
-        Base.metadata.create_all(bind=engine)
-        print("[OK] Створено таблиці: travel_plans, locations")
+        if settings.LOCATIONS_PARTITIONS > 0:
+            tables = [t for t in Base.metadata.sorted_tables if t.name != Location.__tablename__]
+            Base.metadata.create_all(bind=engine, tables=tables)
+            with engine.begin() as conn:
+                create_partitioned_locations(conn, settings.LOCATIONS_PARTITIONS)
+        else:
+            Base.metadata.create_all(bind=engine)
+        print("[OK] Створено таблиці: travel_plans, locations, change_log, change_log_horizon")
         
         # Створюємо функцію та тригер
         with engine.connect() as conn:
@@ -71,6 +85,17 @@ def recreate_tables():
             conn.execute(text(trigger_sql))
             conn.commit()
             print("[OK] Створено тригер update_travel_plans_modtime")
+
+            schema_sql, location_trigger_sql, change_log_trigger_sql = create_change_feed_sql()
+            conn.execute(text(schema_sql))
+            conn.execute(text(location_trigger_sql))
+            conn.execute(text(change_log_trigger_sql))
+            conn.commit()
+            print("[OK] Створено тригери change feed")
+
+            conn.execute(text(create_catalog_sql()))
+            conn.commit()
+            print("[OK] Створено materialized view public_plan_catalog")
         
         print("\n[OK] База даних успішно перестворена!")
         print("[OK] Всі таблиці, constraints, індекси та тригери створені правильно")
@@ -0,0 +1,60 @@
+"""
+Перепідключення SSE-потоку змін з Last-Event-ID простою (без БД: читання сторінок підмінено).
+
+    python -m pytest tests/test_changes_stream.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.change_feed import ExpiredChangeToken
+from app.config import settings
+from app.routers import changes
+from app.schemas.change import ChangeFeedResponse
+
+HEAD = "100.5"
+
+
+@pytest.fixture
+def stream(monkeypatch):
+    """
+    Журнал без змін: since=now -> HEAD. Друге читання завершує потік (event: expired),
+    щоб відповідь була скінченною
+    """
+    reads = []
+
+    def read_page(token):
+        reads.append(token)
+        if len(reads) > 1:
+            raise ExpiredChangeToken("end of test stream")
+        return ChangeFeedResponse(changes=[], next_token=HEAD, has_more=False)
+
+    async def ensure_listening():
+        pass
+
+    monkeypatch.setattr(changes, "_read_page", read_page)
+    monkeypatch.setattr(changes, "_check_token", lambda token: None)
+    monkeypatch.setattr(changes.notifier, "ensure_listening", ensure_listening)
+    monkeypatch.setattr(settings, "CHANGES_STREAM_POLL_INTERVAL", 0.01)
+    return TestClient(main.app), reads
+
+
+def _last_event_id(body: str):
+    ids = [line[len("id: "):] for line in body.splitlines() if line.startswith("id: ")]
+    return ids[-1] if ids else None
+
+
+def test_idle_stream_sends_resumable_id(stream):
+    client, reads = stream
+
+    response = client.get("/api/changes/stream?since=now")
+    assert response.status_code == 200
+    # Порожня сторінка та keepalive несуть позицію кінця журналу, а не "now"
+    assert _last_event_id(response.text) == HEAD
+    assert reads[0] == "now"
+
+    reads.clear()
+    response = client.get("/api/changes/stream?since=now", headers={"Last-Event-ID": HEAD})
+    assert response.status_code == 200
+    # Перепідключення продовжує з отриманої позиції, Last-Event-ID має пріоритет над since
+    assert reads[0] == HEAD
@@ -0,0 +1,52 @@
+"""
+/ready віддає закешований результат проби БД (без БД: стан проби задається напряму).
+
+    python -m pytest tests/test_ready.py
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.config import settings
+from app.health import db_health
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Без фонової проби: lifespan не запускається, стан задає тест
+    monkeypatch.setattr(db_health, "_state", None)
+    monkeypatch.setattr(db_health, "_checked_at", 0.0)
+    return TestClient(main.app)
+
+
+def test_ready_returns_cached_probe(client, monkeypatch):
+    monkeypatch.setattr(db_health, "_select_one", lambda target: None)
+    db_health.probe()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"]["status"] == "ok"
+    assert body["database"]["checked_at"] == db_health._state["checked_at"]
+
+
+def test_ready_degraded_when_probe_fails(client):
+    db_health._set_failed("connection refused")
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["error"] == "Database unavailable"
+    assert body["database"]["status"] == "unavailable"
+    assert body["database"]["error"] == "connection refused"
+
+
+def test_ready_degraded_when_probe_is_stale(client, monkeypatch):
+    monkeypatch.setattr(db_health, "_select_one", lambda target: None)
+    db_health.probe()
+    monkeypatch.setattr(db_health, "_checked_at", db_health._checked_at - settings.READY_MAX_AGE - 1)
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["database"]["status"] == "ok"